@@ -1,43 +1,47 @@
 import csv
 from pprint import pprint
 from src.author import Author
+from src.config import default_config
 from src.model import ArticlesModel
-from tuning import initial_author_count, model_years_range
-from utils.months import Month
+from src.publication_log import PublicationLog, read_publication_log
+from src.runner import run_model
+from utils.months import from_month_index
+import numpy as np
+
+
+def count_articles_per_language(model: ArticlesModel) -> dict[str, int]:
+    """Counts how many published articles there are in each language"""
+    article_store = model.article_store
+
+    language_counts = np.bincount(
+        article_store.language[model.ranking.rows],
+        minlength=len(article_store.languages),
+    )
+
+    return {
+        article_store.languages[code]: int(count)
+        for code, count in enumerate(language_counts)
+        if count > 0
+    }
+
 
 # Create model
-model = ArticlesModel(initial_author_count)
+model = ArticlesModel(
+    default_config, publication_log=PublicationLog("publications.csv")
+)
 
 # model.step(1965, 6)
 # exit()
 
-# For each year
-for year_index in range(model_years_range[1] - model_years_range[0]):
-
-    # Get current year
-    current_year = model_years_range[0] + year_index
 
+def report_year(model: ArticlesModel, year: int) -> None:
+    """Prints how the model looks at the end of a year"""
     print(
-        f"Year {current_year}: {len(model.published_articles)} articles, {model.author_count} authors ({model.active_author_count} active)"
+        f"Year {year}: {len(model.ranking)} articles, {model.author_count} authors ({model.active_author_count} active)"
     )
 
-    # For each month
-    for month_index in range(1, 13):
-
-        # Get current month
-        current_month = Month(month_index)
-
-        # Advance the month
-        model.step(current_year, current_month)
-
     # languages
-    articles_per_language = {}
-
-    for article in model.published_articles:
-        if not articles_per_language.get(article.language):
-            articles_per_language[article.language] = 0
-
-        articles_per_language[article.language] += 1
+    articles_per_language = count_articles_per_language(model)
 
     pprint(
         sorted(articles_per_language.items(), reverse=True, key=lambda item: item[1])[
@@ -46,47 +50,51 @@ for year_index in range(model_years_range[1] - model_years_range[0]):
     )
 
 
-publish_dates = {}
+# Run through every month of every year
+run_model(model, on_year=report_year)
 
-for article in model.published_articles:
-    date_key = f"{article.publish_date[0]} of {article.publish_date[1]}"
+# Wait for every publication to reach the log
+model.publication_log.close()
 
-    if not publish_dates.get(date_key):
-        publish_dates[date_key] = 0
 
-    publish_dates[date_key] += 1
+# Count articles per publish month index, and only name the months when reporting
+publish_months, month_counts = np.unique(
+    model.article_store.publish_month[model.ranking.rows], return_counts=True
+)
+publish_dates = {}
+
+for publish_month, count in zip(publish_months.tolist(), month_counts.tolist()):
+    month, year = from_month_index(publish_month)
+    publish_dates[f"{month} of {year}"] = count
 
 pprint(publish_dates)
 
 # languages
-articles_per_language = {}
-
-for article in model.published_articles:
-    if not articles_per_language.get(article.language):
-        articles_per_language[article.language] = 0
-
-    articles_per_language[article.language] += 1
+articles_per_language = count_articles_per_language(model)
 
 pprint(sorted(articles_per_language.items(), key=lambda item: item[1]))
 
-sorted_articles = sorted(
-    model.published_articles,
-    reverse=True,
-    key=lambda article: len(article.referencing_articles),
-)
-
-sorted_articles = [vars(article) for article in sorted_articles]
+# Join the publication log with the final citation counts
+citations = model.article_store.citations
+sorted_articles = []
+
+for log_row in read_publication_log("publications.csv"):
+    sorted_articles.append(
+        {
+            "name": log_row["name"],
+            "year": log_row["year"],
+            "month": log_row["month"],
+            "referencing_articles": int(citations[log_row["row"]]),
+            "references": log_row["references"],
+            "unique_id": log_row["unique_id"],
+            "language": log_row["language"],
+            "authors": log_row["authors"],
+            "quality": log_row["quality"],
+        }
+    )
 
-for article in sorted_articles:
-    article["authors"] = [author.name for author in article["authors"]]
-    article["references"] = len(article["references"])
-    article["referencing_articles"] = len(article["referencing_articles"])
-    article["year"] = article["publish_date"][1]
-    article["month"] = article["publish_date"][0].name
-    del article["publish_date"]
-    del article["cost"]
-    del article["model"]
-    del article["pos"]
+# Sort published articles by citations
+sorted_articles.sort(key=lambda article: -article["referencing_articles"])
 
 # Save the articles
 with open("results.csv", "w") as outputFile:
@@ -115,4 +123,5 @@ top_6 = sorted_articles[:6] + sorted_articles[-6:]
 
 pprint(list(reversed(top_6)))
 
-# pprint(model.yearly_references)
+# pprint(model.yearly_references.to_dict())
+# model.yearly_references.write_csv("yearly_references.csv")
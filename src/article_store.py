@@ -0,0 +1,113 @@
+import numpy as np
+
+# Publish month of articles that are still being written
+UNPUBLISHED = -1
+
+
+class ArticleStore:
+    """Holds every article's attributes in contiguous arrays, indexed by article row"""
+
+    def __init__(self, languages: list[str], capacity: int = 1024) -> None:
+        # Language names, indexed by language code
+        self.languages = languages
+
+        # Language code of each language name
+        self.language_codes = {
+            language: code for code, language in enumerate(languages)
+        }
+
+        # How many rows are in use
+        self.count = 0
+
+        # === Columns
+        self._quality = np.zeros(capacity, dtype=np.float64)
+        self._publish_month = np.full(capacity, UNPUBLISHED, dtype=np.int32)
+        self._citations = np.zeros(capacity, dtype=np.int32)
+        self._language = np.zeros(capacity, dtype=np.int16)
+        self._cost = np.zeros(capacity, dtype=np.int16)
+
+    def __len__(self) -> int:
+        return self.count
+
+    @property
+    def quality(self) -> np.ndarray:
+        return self._quality[: self.count]
+
+    @property
+    def publish_month(self) -> np.ndarray:
+        """Month index (see utils.months.month_index) each article was published in"""
+        return self._publish_month[: self.count]
+
+    @property
+    def citations(self) -> np.ndarray:
+        """How many published articles reference each article"""
+        return self._citations[: self.count]
+
+    @property
+    def language(self) -> np.ndarray:
+        """Language code of each article"""
+        return self._language[: self.count]
+
+    @property
+    def cost(self) -> np.ndarray:
+        """Months of work each article takes"""
+        return self._cost[: self.count]
+
+    def append(self, quality: float, language: str, cost: int) -> int:
+        """Adds a new unpublished article and returns its row"""
+        if self.count == len(self._quality):
+            self._grow()
+
+        row = self.count
+        self.count += 1
+
+        self._quality[row] = quality
+        self._language[row] = self.language_codes[language]
+        self._cost[row] = cost
+
+        return row
+
+    def get_state(self) -> dict[str, np.ndarray]:
+        """The rows in use of every column"""
+        return {
+            "quality": self.quality.copy(),
+            "publish_month": self.publish_month.copy(),
+            "citations": self.citations.copy(),
+            "language": self.language.copy(),
+            "cost": self.cost.copy(),
+        }
+
+    def set_state(self, state: dict[str, np.ndarray]) -> None:
+        """Replaces every row with the ones from get_state"""
+        self.count = len(state["quality"])
+
+        capacity = max(len(self._quality), self.count)
+
+        for column_name, value in self._column_defaults():
+            column = np.full(capacity, value, dtype=getattr(self, column_name).dtype)
+            column[: self.count] = state[column_name[1:]]
+
+            setattr(self, column_name, column)
+
+    def _grow(self) -> None:
+        """Doubles the capacity of every column"""
+        capacity = 2 * len(self._quality)
+
+        for column_name, value in self._column_defaults():
+            column = getattr(self, column_name)
+
+            grown = np.full(capacity, value, dtype=column.dtype)
+            grown[: len(column)] = column
+
+            setattr(self, column_name, grown)
+
+    @staticmethod
+    def _column_defaults() -> tuple[tuple[str, int], ...]:
+        """Every column, with the value its unused rows hold. New rows start unpublished"""
+        return (
+            ("_quality", 0),
+            ("_publish_month", UNPUBLISHED),
+            ("_citations", 0),
+            ("_language", 0),
+            ("_cost", 0),
+        )
@@ -1,142 +1,92 @@
-from mesa import Agent
+from src.author_store import NONE
 
-from utils.generators import generate_author_name
-from utils.random import skewed_random, skewed_range, weighted_sample
 
-import tuning
-import numpy as np
+class Author:
+    """An author agent. Its state lives in the model's author store, and language learning gets
+    carried out for every author at once by the model (see ArticlesModel.learn_languages).
+    What gets read one author at a time, on every activation and every new article, is kept here as plain values
+    """
 
+    __slots__ = ("unique_id", "model", "row", "competency", "working_on", "last_step")
 
-class Author(Agent):
-    """An author agent"""
+    def __init__(self, unique_id, model, row: int, competency: float):
+        self.unique_id = unique_id
+        self.model = model
 
-    # Initialize author
-    def __init__(self, unique_id, model):
-        super().__init__(unique_id, model)
+        # Row of its attributes in the author store
+        self.row = row
 
-        # Generate a competency, skewed to the medium
-        self.competency = skewed_random(tuning.author_competency_skew)
-
-        # Generate a name
-        self.name = generate_author_name()
-
-        # Generate language proficiency list
-        self.languages = self.generate_language_proficiency_list()
+        # Same as in the author store, as it never changes
+        self.competency = competency
 
         # Will hold reference to whichever article it's currently working
         self.working_on = None
 
-        # What language is currently being learned, and for how long
-        self.learning_language = None
-        self.learning_language_months_left = 0
-
-        # Get lifespan
-        self.articles_left = skewed_range(
-            tuning.author_lifespan_range[0],
-            tuning.author_lifespan_range[1],
-            tuning.author_lifespan_skew,
-            True,
-        )
-
-        # print(f'{self.name} speaks {", ".join(self.languages)}')
+        # Last step the author was activated on
+        self.last_step = None
 
-    def step(self):
-        # print(
-        #     f"I am {self.name}, author number {self.unique_id}. I speak {', '.join(self.languages)}, and I am {'average smart' if self.competency <= 0.7 else 'AMAZINGLY smart' }.  I will publish {self.articles_left} articles."
-        # )
+    @property
+    def name(self) -> str:
+        """Generated on every access, as nothing in the simulation reads it"""
+        return self.model.author_name(self.unique_id)
 
-        # Check if is retired
-        if self.articles_left == 0:
-            return
+    @property
+    def languages(self) -> int:
+        """Spoken languages, as a bitmask of language codes"""
+        return self.model.author_store.get_languages(self.row)
 
-        # Check if it is busy. If not, start new article
-        if self.working_on is None:
-            # Count new article
-            self.articles_left -= 1
+    @languages.setter
+    def languages(self, languages: int) -> None:
+        self.model.author_store.set_languages(self.row, languages)
 
-            # Check if done
-            if self.articles_left > 0:
-                # Apply for an article creation
-                self.model.apply_for_article(self)
+    @property
+    def articles_left(self) -> int:
+        return int(self.model.author_store.articles_left[self.row])
 
-                self.learn_languages()
+    @articles_left.setter
+    def articles_left(self, articles_left: int) -> None:
+        self.model.author_store.articles_left[self.row] = articles_left
 
-            else:
-                self.model.retire(self)
+    @property
+    def learning_language(self) -> int:
+        """Code of the language being learned, if any"""
+        language = self.model.author_store.learning_language[self.row]
+        return None if language == NONE else int(language)
 
-        else:
-            self.learn_languages()
-
-    def generate_language_proficiency_list(self):
-        # Decide how many languages will be added to the list
-        language_count = 1
-        while self.random.random() <= tuning.chance_of_extra_language:
-            language_count += 1
-
-        return set(
-            weighted_sample(
-                list(self.model.language_weights.keys()),
-                list(self.model.language_weights.values()),
-                language_count,
-            )
-        )
-
-    def learn_languages(self):
-        # If already learning one, discount a month
-        if self.learning_language:
-            self.learning_language_months_left -= 1
-
-            # If done, add language to languages
-            if self.learning_language_months_left <= 0:
-                # print(f"{self.name} just learned {self.learning_language}!")
-
-                self.languages.add(self.learning_language)
-                self.learning_language = None
+    def step(self):
+        current_step = self.model.schedule.current_step
 
+        # Only act once per step, even if activated for more than one reason
+        if self.last_step == current_step:
             return
 
-        # If not yet learning something, apply chance to begin
-        if self.random.random() > tuning.begin_learning_language_chance:
-            return
+        self.last_step = current_step
 
-        # Chance to learn english regardless of top articles
-        if (
-            "English" not in self.languages
-            and self.random.random() <= tuning.language_learning_english_bias
-        ):
-            self.start_learning("English")
+        # Check if it is busy
+        if self.working_on is not None:
             return
 
-        # Start learning something new
-        language_sampling_pool: list[str] = []
-
-        # Check top languages
-        for article in self.model.published_articles:
-            # Check if author already knows this language
-            if article.language in self.languages:
-                continue
-
-            # Add to pool
-            language_sampling_pool.append(article.language)
-
-            # Check if done
-            if len(language_sampling_pool) >= tuning.language_sampling_pool_size:
-                break
+        # Check if is retired
+        articles_left = self.model.author_store.articles_left
+        left = int(articles_left[self.row])
 
-        # If no languages available, too bad!
-        if len(language_sampling_pool) == 0:
+        if left == 0:
             return
 
-        # Sample a language from one of these top languages
-        self.start_learning(self.random.choice(language_sampling_pool))
+        # Count new article
+        left -= 1
+        articles_left[self.row] = left
 
-    def start_learning(self, language: str):
-        self.learning_language = language
+        # Check if done
+        if left > 0:
+            # Apply for an article creation
+            self.model.apply_for_article(self)
+
+        else:
+            self.model.retire(self)
 
-        # Set how long it will take to learn language
-        self.learning_language_months_left = skewed_range(
-            tuning.language_learning_duration_range[0],
-            tuning.language_learning_duration_range[1],
-            tuning.language_learning_duration_skew,
-            True,
-        )
+    def wake_up(self):
+        """Makes sure the author gets activated once it has become idle"""
+        # If it was already activated this step, it will only notice on the next one
+        if self.last_step == self.model.schedule.current_step:
+            self.model.schedule.add_event(self, 1)
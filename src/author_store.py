@@ -0,0 +1,148 @@
+from utils.language_masks import mask_words, word_count, words_mask
+import numpy as np
+
+# Stands for no value in the integer columns, e.g. no language being learned
+NONE = -1
+
+
+class AuthorStore:
+    """Holds every author's state in contiguous arrays, indexed by author row"""
+
+    def __init__(self, language_count: int, capacity: int = 1024) -> None:
+        # How many words each language bitmask takes
+        self.word_count = word_count(language_count)
+
+        # How many rows are in use
+        self.count = 0
+
+        # === Columns
+        self._competency = np.zeros(capacity, dtype=np.float64)
+        self._articles_left = np.zeros(capacity, dtype=np.int32)
+        self._learning_language = np.full(capacity, NONE, dtype=np.int16)
+        self._learning_done_step = np.full(capacity, NONE, dtype=np.int32)
+        self._next_attempt_step = np.zeros(capacity, dtype=np.int32)
+
+        # Languages spoken, as bitmasks split into little-endian 64 bit words
+        self._languages = np.zeros((capacity, self.word_count), dtype="<u8")
+
+    def __len__(self) -> int:
+        return self.count
+
+    @property
+    def competency(self) -> np.ndarray:
+        return self._competency[: self.count]
+
+    @property
+    def articles_left(self) -> np.ndarray:
+        """Articles each author will still start. Authors with none left are retired"""
+        return self._articles_left[: self.count]
+
+    @property
+    def learning_language(self) -> np.ndarray:
+        """Code of the language each author is learning, or NONE"""
+        return self._learning_language[: self.count]
+
+    @property
+    def learning_done_step(self) -> np.ndarray:
+        """Step on which each author's language will be learned"""
+        return self._learning_done_step[: self.count]
+
+    @property
+    def next_attempt_step(self) -> np.ndarray:
+        """Step on which each author will next try to start learning a language"""
+        return self._next_attempt_step[: self.count]
+
+    @property
+    def language_words(self) -> np.ndarray:
+        """Languages of each author, one row of bitmask words each"""
+        return self._languages[: self.count]
+
+    def get_languages(self, row: int) -> int:
+        """Languages of an author as a bitmask"""
+        return words_mask(self._languages[row])
+
+    def set_languages(self, row: int, languages: int) -> None:
+        self._languages[row] = mask_words(languages, self.word_count)
+
+    def add_languages(self, rows: np.ndarray, languages: np.ndarray) -> None:
+        """Adds one language to each of a batch of different authors"""
+        languages = np.asarray(languages)
+
+        self._languages[rows, languages // 64] |= np.left_shift(
+            np.uint64(1), (languages % 64).astype(np.uint64)
+        )
+
+    def speak(self, rows: np.ndarray, language: int) -> np.ndarray:
+        """Whether each of a batch of authors speaks a language"""
+        return (
+            self._languages[rows, language // 64] >> np.uint64(language % 64)
+        ) & np.uint64(1) == 1
+
+    def append_many(
+        self,
+        competencies: np.ndarray,
+        articles_left: np.ndarray,
+        language_words: np.ndarray,
+        next_attempt_steps: np.ndarray,
+    ) -> np.ndarray:
+        """Adds a cohort of new, idle authors and returns their rows"""
+        start = self.count
+        self.count += len(competencies)
+
+        while self.count > len(self._competency):
+            self._grow()
+
+        self._competency[start : self.count] = competencies
+        self._articles_left[start : self.count] = articles_left
+        self._languages[start : self.count] = language_words
+        self._next_attempt_step[start : self.count] = next_attempt_steps
+
+        return np.arange(start, self.count)
+
+    def get_state(self) -> dict[str, np.ndarray]:
+        """The rows in use of every column"""
+        return {
+            "competency": self.competency.copy(),
+            "articles_left": self.articles_left.copy(),
+            "learning_language": self.learning_language.copy(),
+            "learning_done_step": self.learning_done_step.copy(),
+            "next_attempt_step": self.next_attempt_step.copy(),
+            "languages": self.language_words.copy(),
+        }
+
+    def set_state(self, state: dict[str, np.ndarray]) -> None:
+        """Replaces every row with the ones from get_state"""
+        self.count = len(state["competency"])
+
+        capacity = max(len(self._competency), self.count)
+
+        for column_name, value in self._column_defaults():
+            column = getattr(self, column_name)
+            column = np.full((capacity, *column.shape[1:]), value, dtype=column.dtype)
+            column[: self.count] = state[column_name[1:]]
+
+            setattr(self, column_name, column)
+
+    def _grow(self) -> None:
+        """Doubles the capacity of every column"""
+        capacity = 2 * len(self._competency)
+
+        for column_name, value in self._column_defaults():
+            column = getattr(self, column_name)
+
+            grown = np.full((capacity, *column.shape[1:]), value, dtype=column.dtype)
+            grown[: len(column)] = column
+
+            setattr(self, column_name, grown)
+
+    @staticmethod
+    def _column_defaults() -> tuple[tuple[str, int], ...]:
+        """Every column, with the value its unused rows hold"""
+        return (
+            ("_competency", 0),
+            ("_articles_left", 0),
+            ("_learning_language", NONE),
+            ("_learning_done_step", NONE),
+            ("_next_attempt_step", 0),
+            ("_languages", 0),
+        )
@@ -0,0 +1,265 @@
+from argparse import ArgumentParser
+from concurrent.futures import ProcessPoolExecutor
+from time import perf_counter
+from timeit import timeit
+from src.config import Config, default_config
+from src.model import ArticlesModel
+from src.profiling import Profiler, phases
+from utils.months import Month
+import json
+import platform
+import resource
+import sys
+import tracemalloc
+import numpy as np
+
+# Scenarios, each with the parameters it changes and its seed
+scenarios = {
+    "small": (
+        {"model_years_range": (1915, 1950)},
+        1,
+    ),
+    "default": (
+        {},
+        2,
+    ),
+    "authors_10x": (
+        {
+            "model_years_range": (1915, 1950),
+            "initial_author_count": 10 * default_config.initial_author_count,
+            "new_author_range": tuple(
+                10 * count for count in default_config.new_author_range
+            ),
+        },
+        3,
+    ),
+}
+
+# Relative slowdown past which a measure counts as a regression
+default_threshold = 0.10
+
+
+def run_scenario(name: str) -> dict:
+    """Runs a scenario from start to end, and measures every step"""
+    changes, seed = scenarios[name]
+    config: Config = default_config.replace(**changes)
+
+    start = perf_counter()
+    model = ArticlesModel(config, seed)
+    setup_seconds = perf_counter() - start
+
+    published_articles = []
+
+    # Only the phases get timed, so agents and helpers run at full speed
+    with Profiler(detailed=False).attach(model) as profiler:
+        for year in range(*config.model_years_range):
+            for month_index in range(1, 13):
+                model.step(year, Month(month_index))
+
+                published_articles.append(len(model.ranking))
+
+    step_seconds = profiler.monthly_seconds["step"]
+
+    return {
+        "seed": seed,
+        "changes": changes,
+        "steps": len(step_seconds),
+        "setup_seconds": setup_seconds,
+        "total_seconds": sum(step_seconds),
+        "phase_seconds": {phase: profiler.seconds[phase] for phase, _, _ in phases},
+        "peak_memory_mb": _peak_memory_mb(),
+        "published_articles": published_articles,
+        "step_seconds": step_seconds,
+        "phase_step_seconds": {
+            phase: profiler.monthly_seconds[phase] for phase, _, _ in phases
+        },
+    }
+
+
+def _peak_memory_mb() -> float:
+    """Peak resident memory of this process"""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+    # Linux reports kilobytes, macOS bytes
+    return peak / (2**20 if sys.platform == "darwin" else 2**10)
+
+
+def measure_agents(author_count: int = 100_000) -> dict:
+    """Memory and attribute access cost of agents: the articles of a short run, and a large cohort of new authors"""
+    config = default_config.replace(model_years_range=(1915, 1925))
+    model = ArticlesModel(config, 4)
+
+    for year in range(*config.model_years_range):
+        for month_index in range(1, 13):
+            model.step(year, Month(month_index))
+
+    article = model.articles[0]
+
+    # Everything allocated while creating the authors, language sets included
+    tracemalloc.start()
+    model.introduce_authors(author_count)
+    author_bytes = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+
+    author = next(
+        agent
+        for _, agent in model.schedule.get_events()
+        if hasattr(agent, "competency")
+    )
+
+    return {
+        "article_object_bytes": float(
+            np.mean([_object_bytes(article) for article in model.articles])
+        ),
+        "author_object_bytes": _object_bytes(author),
+        "bytes_per_new_author": author_bytes / author_count,
+        "attribute_lookup_ns": 1e9
+        * timeit("author.competency; article.row", globals=locals(), number=10**6)
+        / 2e6,
+    }
+
+
+def _object_bytes(agent) -> int:
+    """Size of an object and of its attribute dict, if it has one"""
+    return sys.getsizeof(agent) + (
+        sys.getsizeof(vars(agent)) if hasattr(agent, "__dict__") else 0
+    )
+
+
+def run_benchmarks(names: list[str]) -> dict:
+    """Runs each scenario in a fresh process, so peak memory is its own"""
+    results = {
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "machine": platform.machine(),
+        "scenarios": {},
+    }
+
+    with ProcessPoolExecutor(max_workers=1) as executor:
+        results["agents"] = executor.submit(measure_agents).result()
+
+    print(
+        f"agents: {results['agents']['author_object_bytes']} B per author object, "
+        f"{results['agents']['bytes_per_new_author']:.0f} B per new author, "
+        f"{results['agents']['attribute_lookup_ns']:.1f} ns per attribute lookup"
+    )
+
+    for name in names:
+        with ProcessPoolExecutor(max_workers=1) as executor:
+            results["scenarios"][name] = executor.submit(run_scenario, name).result()
+
+        print(
+            f"{name}: {results['scenarios'][name]['total_seconds']:.2f}s, "
+            f"{results['scenarios'][name]['published_articles'][-1]} articles, "
+            f"{results['scenarios'][name]['peak_memory_mb']:.0f} MB"
+        )
+
+    return results
+
+
+def compare(
+    baseline: dict, current: dict, threshold: float = default_threshold
+) -> list[str]:
+    """Lists every measure of current that is worse than in baseline by more than threshold"""
+    regressions = []
+
+    # Agent sizes and lookups
+    for measure, current_value in current.get("agents", {}).items():
+        baseline_value = baseline.get("agents", {}).get(measure)
+
+        if baseline_value and current_value > baseline_value * (1 + threshold):
+            regressions.append(
+                f"agents {measure}: {baseline_value:.1f} -> {current_value:.1f} "
+                f"(+{100 * (current_value / baseline_value - 1):.0f}%)"
+            )
+
+    for name, current_result in current["scenarios"].items():
+        baseline_result = baseline["scenarios"].get(name)
+
+        # Nothing to compare with
+        if baseline_result is None:
+            continue
+
+        measures = [
+            (
+                "total_seconds",
+                baseline_result["total_seconds"],
+                current_result["total_seconds"],
+            ),
+            (
+                "peak_memory_mb",
+                baseline_result["peak_memory_mb"],
+                current_result["peak_memory_mb"],
+            ),
+        ] + [
+            (
+                f"phase_seconds.{phase}",
+                baseline_result["phase_seconds"][phase],
+                current_result["phase_seconds"][phase],
+            )
+            for phase in current_result["phase_seconds"]
+            if phase in baseline_result["phase_seconds"]
+        ]
+
+        for measure, baseline_value, current_value in measures:
+            if baseline_value > 0 and current_value > baseline_value * (1 + threshold):
+                regressions.append(
+                    f"{name} {measure}: {baseline_value:.3f} -> {current_value:.3f} "
+                    f"(+{100 * (current_value / baseline_value - 1):.0f}%)"
+                )
+
+    return regressions
+
+
+if __name__ == "__main__":
+    parser = ArgumentParser(description="Benchmarks the model on seeded scenarios")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = commands.add_parser(
+        "run", help="Runs scenarios and saves their results"
+    )
+    run_parser.add_argument(
+        "scenarios", nargs="*", help=f"Any of {', '.join(scenarios)}. Defaults to all"
+    )
+    run_parser.add_argument("-o", "--output", default="benchmark.json")
+
+    compare_parser = commands.add_parser(
+        "compare", help="Flags regressions of a result file against a baseline"
+    )
+    compare_parser.add_argument("baseline")
+    compare_parser.add_argument("current")
+    compare_parser.add_argument(
+        "-t", "--threshold", type=float, default=default_threshold
+    )
+
+    arguments = parser.parse_args()
+
+    if arguments.command == "run":
+        # Checked here, as argparse would check the whole default list against the choices
+        unknown_scenarios = set(arguments.scenarios) - set(scenarios)
+
+        if unknown_scenarios:
+            run_parser.error(
+                f"unknown scenarios: {', '.join(sorted(unknown_scenarios))}"
+            )
+
+        with open(arguments.output, "w") as output_file:
+            json.dump(
+                run_benchmarks(arguments.scenarios or list(scenarios)), output_file
+            )
+
+    else:
+        with open(arguments.baseline) as baseline_file, open(
+            arguments.current
+        ) as current_file:
+            regressions = compare(
+                json.load(baseline_file), json.load(current_file), arguments.threshold
+            )
+
+        for regression in regressions:
+            print(f"Regression: {regression}")
+
+        if regressions:
+            sys.exit(1)
+
+        print("No regressions")
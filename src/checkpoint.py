@@ -0,0 +1,301 @@
+from src.article import Article
+from src.author import Author
+from src.author_store import NONE
+from src.config import Config
+from utils.generators import id_getter
+from utils.random import KeyedGenerator
+import json
+import numpy as np
+
+# Bumped whenever the layout below changes
+checkpoint_version = 8
+
+# Model attributes holding numpy generators
+generator_names = ("rng", "author_rng", "article_rng")
+
+
+def write_checkpoint(model, path: str) -> None:
+    """Writes the whole state of a model, taken between steps, to a single npz file.
+    Agents are flattened into arrays, and everything that isn't an array goes into a json header
+    """
+    article_store = model.article_store
+    articles: list[Article] = model.articles
+    events = model.schedule.get_events()
+
+    arrays = {
+        # === Articles, indexed by row
+        "article_ids": np.array([article.unique_id for article in articles]),
+        "article_author_counts": np.array(
+            [len(article.authors) for article in articles]
+        ),
+        "article_authors": np.array(
+            [author.row for article in articles for author in article.authors]
+        ),
+        # === Authors, indexed by row. Their other attributes are in the author store
+        "author_ids": np.array([author.unique_id for author in model.authors]),
+        "author_working_on": np.array(
+            [
+                NONE if author.working_on is None else author.working_on.row
+                for author in model.authors
+            ]
+        ),
+        "author_last_step": np.array(
+            [
+                NONE if author.last_step is None else author.last_step
+                for author in model.authors
+            ]
+        ),
+        # === Languages
+        "language_weights": model.language_weights,
+        "language_counts": model.language_counts,
+        # === Scheduler calendar, as (step, agent) pairs in filing order
+        "event_steps": np.array([step for step, _ in events]),
+        "event_is_article": np.array(
+            [isinstance(agent, Article) for _, agent in events]
+        ),
+        "event_indexes": np.array([agent.row for _, agent in events]),
+        "waiting_authors": np.array(
+            [author.row for author in model.new_article_waiting_list]
+        ),
+    }
+
+    for name, array in article_store.get_state().items():
+        arrays[f"store_{name}"] = array
+
+    for name, array in model.ranking.get_state().items():
+        arrays[f"ranking_{name}"] = array
+
+    for name, array in model.citation_graph.get_state().items():
+        arrays[f"graph_{name}"] = array
+
+    for name, array in model.author_store.get_state().items():
+        arrays[f"author_store_{name}"] = array
+
+    for name, array in model.yearly_references.get_state().items():
+        arrays[f"yearly_references_{name}"] = array
+
+    seed_sequence = model.seed_sequence
+    name_seed = model.name_seed
+
+    header = {
+        "version": checkpoint_version,
+        "config": model.config.to_dict(),
+        "languages": model.languages,
+        "seed_sequence": {
+            "entropy": seed_sequence.entropy,
+            "spawn_key": list(seed_sequence.spawn_key),
+            "pool_size": seed_sequence.pool_size,
+            "n_children_spawned": seed_sequence.n_children_spawned,
+        },
+        # Names are drawn from it and the agent ids, so they don't need saving
+        "name_seed": {
+            "entropy": name_seed.entropy,
+            "spawn_key": list(name_seed.spawn_key),
+        },
+        "generators": {
+            name: getattr(model, name).bit_generator.state for name in generator_names
+        },
+        "ids_taken": model.get_id.ids_taken,
+        "author_count": model.author_count,
+        "active_author_count": model.active_author_count,
+        "max_referencing_articles": model.max_referencing_articles,
+        "current_month": model.current_month,
+        "steps": model.schedule.steps,
+        "time": model.schedule.time,
+    }
+
+    arrays["header"] = _encode_strings([json.dumps(header)])
+
+    # Writing through a file object keeps numpy from appending .npz to the path
+    with open(path, "wb") as output_file:
+        np.savez_compressed(output_file, **arrays)
+
+
+def checkpoint_month(path: str) -> int:
+    """Month index of the last step a checkpoint holds, or None if it was written before the first one"""
+    with np.load(path) as checkpoint:
+        header = json.loads(_decode_strings(checkpoint["header"])[0])
+
+    return header["current_month"]
+
+
+def read_checkpoint(
+    model_class, path: str, config: Config = None, publication_log=None
+):
+    """Builds a model of model_class from a file written by write_checkpoint, ready to take the next step.
+    Passing a config replaces the saved one, for branching off a saved run. Otherwise the saved parameters are used,
+    with the default reference_chance_modifier as functions don't get saved
+    """
+    with np.load(path) as checkpoint:
+        arrays = dict(checkpoint)
+
+    header = json.loads(_decode_strings(arrays["header"])[0])
+
+    if header["version"] != checkpoint_version:
+        raise ValueError(
+            f"Checkpoint version {header['version']} can't be read, expected {checkpoint_version}"
+        )
+
+    # A log that doesn't pick up where the checkpoint left off would lose or repeat publications
+    if publication_log and publication_log.resume_month != header["current_month"]:
+        raise ValueError(
+            f"The publication log must be opened with resume_month={header['current_month']} to continue this checkpoint"
+        )
+
+    # Start from a fresh model, so everything derived from the config gets built, then overwrite its state
+    model = model_class(
+        config or Config.from_dict(header["config"]), 0, publication_log
+    )
+
+    if header["languages"] != model.languages:
+        raise ValueError("Checkpoint was written with a different list of languages")
+
+    # === Randomness
+    model.seed_sequence = np.random.SeedSequence(
+        header["seed_sequence"]["entropy"],
+        spawn_key=tuple(header["seed_sequence"]["spawn_key"]),
+        pool_size=header["seed_sequence"]["pool_size"],
+        n_children_spawned=header["seed_sequence"]["n_children_spawned"],
+    )
+
+    model.name_seed = np.random.SeedSequence(
+        header["name_seed"]["entropy"],
+        spawn_key=tuple(header["name_seed"]["spawn_key"]),
+    )
+    model.name_generator = KeyedGenerator(model.name_seed)
+
+    for name in generator_names:
+        getattr(model, name).bit_generator.state = header["generators"][name]
+
+    model.get_id = id_getter(header["ids_taken"])
+
+    # === Counters and languages
+    model.author_count = header["author_count"]
+    model.active_author_count = header["active_author_count"]
+    model.max_referencing_articles = header["max_referencing_articles"]
+
+    model.current_month = header["current_month"]
+
+    model.language_weights = arrays["language_weights"]
+    model.language_counts = arrays["language_counts"]
+
+    # === Article store, ranking, citations and referenced years
+    model.article_store.set_state(
+        {
+            name[len("store_") :]: array
+            for name, array in arrays.items()
+            if name.startswith("store_")
+        }
+    )
+
+    model.ranking.set_state(
+        {
+            name[len("ranking_") :]: array
+            for name, array in arrays.items()
+            if name.startswith("ranking_")
+        }
+    )
+
+    model.citation_graph.set_state(
+        {
+            name[len("graph_") :]: array
+            for name, array in arrays.items()
+            if name.startswith("graph_")
+        }
+    )
+
+    model.yearly_references.set_state(
+        {
+            name[len("yearly_references_") :]: array
+            for name, array in arrays.items()
+            if name.startswith("yearly_references_")
+        }
+    )
+
+    # === Authors
+    model.author_store.set_state(
+        {
+            name[len("author_store_") :]: array
+            for name, array in arrays.items()
+            if name.startswith("author_store_")
+        }
+    )
+
+    model.authors = [
+        Author(unique_id, model, row, competency)
+        for row, (unique_id, competency) in enumerate(
+            zip(
+                arrays["author_ids"].tolist(),
+                model.author_store.competency.tolist(),
+            )
+        )
+    ]
+    authors = model.authors
+
+    for author, last_step in zip(authors, arrays["author_last_step"].tolist()):
+        author.last_step = None if last_step == NONE else last_step
+
+    # === Articles
+    article_authors = _split(arrays["article_authors"], arrays["article_author_counts"])
+    model.articles = [
+        _restore_agent(
+            Article,
+            unique_id,
+            model,
+            authors=[authors[index] for index in article_authors[row].tolist()],
+            row=row,
+        )
+        for row, unique_id in enumerate(arrays["article_ids"].tolist())
+    ]
+
+    for author, row in zip(authors, arrays["author_working_on"].tolist()):
+        author.working_on = None if row == NONE else model.articles[row]
+
+    # === Scheduler
+    model.schedule.steps = header["steps"]
+    model.schedule.time = header["time"]
+
+    model.schedule.set_events(
+        [
+            (step, model.articles[index] if is_article else authors[index])
+            for step, is_article, index in zip(
+                arrays["event_steps"].tolist(),
+                arrays["event_is_article"].tolist(),
+                arrays["event_indexes"].tolist(),
+            )
+        ]
+    )
+
+    model.new_article_waiting_list = [
+        authors[index] for index in arrays["waiting_authors"].tolist()
+    ]
+
+    return model
+
+
+def _restore_agent(agent_class, unique_id: int, model, **attributes):
+    """Creates an agent with the given attributes, without running its constructor"""
+    agent = agent_class.__new__(agent_class)
+    agent.unique_id = unique_id
+    agent.model = model
+
+    for name, value in attributes.items():
+        setattr(agent, name, value)
+
+    return agent
+
+
+def _encode_strings(strings: list[str]) -> np.ndarray:
+    """Packs strings without line breaks into a single utf-8 byte array"""
+    return np.frombuffer("\n".join(strings).encode(), dtype=np.uint8).copy()
+
+
+def _decode_strings(array: np.ndarray) -> list[str]:
+    text = array.tobytes().decode()
+
+    return text.split("\n") if text else []
+
+
+def _split(values: np.ndarray, counts: np.ndarray) -> list[np.ndarray]:
+    """Splits a flat array into consecutive chunks of the given sizes"""
+    return np.split(values, np.cumsum(counts)[:-1]) if len(counts) else []
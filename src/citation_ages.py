@@ -0,0 +1,94 @@
+import csv
+import numpy as np
+
+
+class CitationAgeMatrix:
+    """How many references articles started in each year make to articles published in each year,
+    as a dense count matrix indexed by (citing year, cited year) offsets from the first year.
+    Years past the end grow the matrix, so runs can be continued beyond the range it was sized for
+    """
+
+    def __init__(self, years_range: tuple[int, int]) -> None:
+        # Year of the first row and column
+        self.first_year = years_range[0]
+
+        # Citing years by cited years
+        self._counts = np.zeros((years_range[1] - years_range[0],) * 2, dtype=np.int64)
+
+    @property
+    def years(self) -> np.ndarray:
+        """Year of each row and column"""
+        return np.arange(self.first_year, self.first_year + len(self._counts))
+
+    @property
+    def counts(self) -> np.ndarray:
+        """The matrix, with counts[citing year - first_year, cited year - first_year]"""
+        return self._counts
+
+    def add(self, year: int, reference_years: np.ndarray) -> None:
+        """Counts a batch of references made in a year, given the publish year of each referenced article"""
+        if not len(reference_years):
+            return
+
+        offsets = np.asarray(reference_years) - self.first_year
+
+        if offsets.min() < 0 or year < self.first_year:
+            raise ValueError(f"Years before {self.first_year} can't be counted")
+
+        self._fit(max(year, self.first_year + int(offsets.max())))
+
+        row = self._counts[year - self.first_year]
+        row += np.bincount(offsets, minlength=len(row))
+
+    def to_dict(self) -> dict[int, dict[int, int]]:
+        """Non-zero counts as {citing year: {cited year: count}}"""
+        years = self.years.tolist()
+        counts = {}
+
+        for row, column in zip(*np.nonzero(self._counts)):
+            counts.setdefault(years[row], {})[years[column]] = int(
+                self._counts[row, column]
+            )
+
+        return counts
+
+    def write_csv(self, path: str) -> None:
+        """Writes the matrix to a csv file, one row per citing year and one column per cited year"""
+        years = self.years.tolist()
+
+        with open(path, "w", newline="") as output_file:
+            writer = csv.writer(output_file)
+            writer.writerow(["year", *years])
+
+            for year, row in zip(years, self._counts.tolist()):
+                writer.writerow([year, *row])
+
+    def get_state(self) -> dict[str, np.ndarray]:
+        return {"first_year": np.array(self.first_year), "counts": self._counts.copy()}
+
+    def set_state(self, state: dict[str, np.ndarray]) -> None:
+        """Takes the counts from get_state, keeping this matrix's first year when it's earlier"""
+        saved_first_year = int(state["first_year"])
+        counts = state["counts"]
+
+        if saved_first_year < self.first_year:
+            self.first_year = saved_first_year
+            self._counts = np.zeros((0, 0), dtype=np.int64)
+
+        start = saved_first_year - self.first_year
+        end = start + len(counts)
+
+        self._fit(self.first_year + end - 1)
+        self._counts[:] = 0
+        self._counts[start:end, start:end] = counts
+
+    def _fit(self, last_year: int) -> None:
+        """Grows the matrix until last_year has a row and a column"""
+        size = last_year - self.first_year + 1
+
+        if size <= len(self._counts):
+            return
+
+        grown = np.zeros((size, size), dtype=np.int64)
+        grown[: len(self._counts), : len(self._counts)] = self._counts
+        self._counts = grown
@@ -0,0 +1,101 @@
+import numpy as np
+
+
+class CitationGraph:
+    """References of every article, indexed by article row, in compressed sparse row layout:
+    one edge array holding each article's referenced rows in a contiguous slice, and the offsets of those slices.
+    Articles still being written are included, as their references are drawn when they are started
+    """
+
+    def __init__(self, capacity: int = 1024, edge_capacity: int = 16384) -> None:
+        # How many articles have their references in
+        self.count = 0
+
+        # How many edges are in use
+        self.edge_count = 0
+
+        # Where each article's slice starts, plus where the last one ends
+        self._offsets = np.zeros(capacity + 1, dtype=np.int64)
+
+        # Referenced rows of every article, one after the other
+        self._edges = np.zeros(edge_capacity, dtype=np.int32)
+
+    def __len__(self) -> int:
+        return self.count
+
+    def append(self, references: np.ndarray) -> int:
+        """Adds the references of the next article row, and returns that row"""
+        if self.count + 1 == len(self._offsets):
+            self._offsets = self._grown(self._offsets, self.count + 2)
+
+        if self.edge_count + len(references) > len(self._edges):
+            self._edges = self._grown(self._edges, self.edge_count + len(references))
+
+        row = self.count
+        self.count += 1
+
+        self._edges[self.edge_count : self.edge_count + len(references)] = references
+        self.edge_count += len(references)
+        self._offsets[self.count] = self.edge_count
+
+        return row
+
+    def references(self, row: int) -> np.ndarray:
+        """Rows referenced by an article"""
+        return self._edges[self._offsets[row] : self._offsets[row + 1]]
+
+    def references_of(self, rows: np.ndarray) -> np.ndarray:
+        """Rows referenced by a batch of articles, one slice after the other"""
+        starts = self._offsets[rows]
+        counts = self._offsets[rows + 1] - starts
+
+        # Position of each edge within its own slice
+        slice_offsets = np.arange(counts.sum()) - np.repeat(
+            np.cumsum(counts) - counts, counts
+        )
+
+        return self._edges[np.repeat(starts, counts) + slice_offsets]
+
+    def reference_counts(self) -> np.ndarray:
+        """How many references each article has"""
+        return np.diff(self._offsets[: self.count + 1])
+
+    def csr(self) -> tuple[np.ndarray, np.ndarray]:
+        """The graph as (offsets, edges), where the rows referenced by row r are edges[offsets[r]:offsets[r + 1]]"""
+        return self._offsets[: self.count + 1], self._edges[: self.edge_count]
+
+    def cited_by_csr(self) -> tuple[np.ndarray, np.ndarray]:
+        """The reversed graph, in the same layout as csr: the rows that reference each row. Built on every call"""
+        offsets, edges = self.csr()
+
+        # Article that each edge comes from
+        sources = np.repeat(np.arange(self.count), np.diff(offsets))
+
+        order = np.argsort(edges, kind="stable")
+
+        cited_by_offsets = np.zeros(self.count + 1, dtype=np.int64)
+        np.cumsum(np.bincount(edges, minlength=self.count), out=cited_by_offsets[1:])
+
+        return cited_by_offsets, sources[order].astype(np.int32)
+
+    def get_state(self) -> dict[str, np.ndarray]:
+        """The slices in use"""
+        offsets, edges = self.csr()
+
+        return {"offsets": offsets.copy(), "edges": edges.copy()}
+
+    def set_state(self, state: dict[str, np.ndarray]) -> None:
+        """Replaces the whole graph with one from get_state"""
+        self.count = len(state["offsets"]) - 1
+        self.edge_count = len(state["edges"])
+
+        self._offsets = state["offsets"].astype(np.int64)
+        self._edges = state["edges"].astype(np.int32)
+
+    @staticmethod
+    def _grown(array: np.ndarray, minimum_size: int) -> np.ndarray:
+        """Copy of an array with at least double its size"""
+        grown = np.zeros(max(2 * len(array), minimum_size), dtype=array.dtype)
+        grown[: len(array)] = array
+
+        return grown
@@ -0,0 +1,92 @@
+from dataclasses import dataclass, fields, replace
+from typing import Callable
+
+import tuning
+
+
+@dataclass(frozen=True)
+class Config:
+    """Every model parameter. Defaults come from tuning.py, see there for what each one does"""
+
+    # === Model settings
+    model_years_range: tuple[int, int] = tuning.model_years_range
+    model_seed: int = tuning.model_seed
+
+    # === Article publication
+    article_cost_range: tuple[int, int] = tuning.article_cost_range
+    article_cost_skew: int = tuning.article_cost_skew
+    extra_author_chance: float = tuning.extra_author_chance
+    extra_author_chance_decay: float = tuning.extra_author_chance_decay
+    article_quality_randomness: float = tuning.article_quality_randomness
+
+    # === Article Referencing
+    reference_count_range: tuple[int, int] = tuning.reference_count_range
+    reference_count_skew: int = tuning.reference_count_skew
+    reference_chance_modifier: Callable[[int], float] = tuning.reference_chance_modifier
+    reference_count_attractability: float = tuning.reference_count_attractability
+    reference_age_unattractiveness: float = tuning.reference_age_unattractiveness
+    reference_sampling_pool_size: int = tuning.reference_sampling_pool_size
+    reference_randomly_chance: float = tuning.reference_randomly_chance
+
+    # === Article name generation
+    connector_chance: float = tuning.connector_chance
+    adjective_chance: float = tuning.adjective_chance
+    noun_as_adjective_chance: float = tuning.noun_as_adjective_chance
+    all_capitalized_chance: float = tuning.all_capitalized_chance
+    plural_chance: float = tuning.plural_chance
+    noun_article_chance: float = tuning.noun_article_chance
+    min_name_size: int = tuning.min_name_size
+    max_name_size: int = tuning.max_name_size
+
+    # === Authors
+    initial_author_count: int = tuning.initial_author_count
+    new_author_range: tuple[int, int] = tuning.new_author_range
+    new_author_skew: int = tuning.new_author_skew
+    author_lifespan_range: tuple[int, int] = tuning.author_lifespan_range
+    author_lifespan_skew: int = tuning.author_lifespan_skew
+    chance_of_extra_language: float = tuning.chance_of_extra_language
+    author_competency_skew: int = tuning.author_competency_skew
+
+    # === Language Learning & Choosing
+    language_sampling_pool_size: int = tuning.language_sampling_pool_size
+    begin_learning_language_chance: float = tuning.begin_learning_language_chance
+    language_learning_duration_range: tuple[int, int] = (
+        tuning.language_learning_duration_range
+    )
+    language_learning_duration_skew: int = tuning.language_learning_duration_skew
+    language_learning_english_bias: float = tuning.language_learning_english_bias
+    article_language_evaluation_pool_size: int = (
+        tuning.article_language_evaluation_pool_size
+    )
+    language_evaluation_pool_size: int = tuning.language_evaluation_pool_size
+    language_evaluation_windowed: bool = tuning.language_evaluation_windowed
+    language_update_speed: float = tuning.language_update_speed
+
+    def replace(self, **changes) -> "Config":
+        """Returns a copy with some parameters changed"""
+        return replace(self, **changes)
+
+    def to_dict(self, include_functions: bool = False) -> dict:
+        """Parameter values by name. Functions are left out unless asked for, as they can't go into tables"""
+        return {
+            field.name: getattr(self, field.name)
+            for field in fields(self)
+            if include_functions or not callable(getattr(self, field.name))
+        }
+
+    @classmethod
+    def from_dict(cls, values: dict) -> "Config":
+        """Builds a config from to_dict's output, which may have been through json. Missing parameters keep their defaults"""
+        names = {field.name for field in fields(cls)}
+
+        return cls(
+            **{
+                name: tuple(value) if isinstance(value, list) else value
+                for name, value in values.items()
+                if name in names
+            }
+        )
+
+
+# Configuration straight from tuning.py
+default_config = Config()
@@ -1,59 +1,175 @@
 from data.language_frequency import language_frequency
 from pprint import pprint
 from src.article import Article
+from src.article_store import ArticleStore
+from src.citation_ages import CitationAgeMatrix
 from src.author import Author
-from utils.article_name_generator import generate_article_name
-from utils.months import Month
-from utils.random import skewed_range, weighted_sample
-from utils.generators import id_getter
+from src.author_store import NONE, AuthorStore
+from src.checkpoint import read_checkpoint, write_checkpoint
+from src.citation_graph import CitationGraph
+from src.config import Config, default_config
+from src.publication_log import PublicationLog
+from src.ranking import AttractivenessRanking
+from src.reference_sampler import ReferenceSampler
+from src.scheduler import EventScheduler
+from src.top_languages import TopLanguages
+from src.waiting_list import WaitingList
+from utils.article_name_generator import title_generator
+from utils.months import Month, from_month_index, month_index
+from utils.random import (
+    KeyedGenerator,
+    as_seed_sequence,
+    skewed_random_many,
+    skewed_range,
+    skewed_range_many,
+    weighted_sample,
+    weighted_sample_many,
+)
+from utils.generators import generate_author_name, id_getter
+from utils.language_masks import boolean_mask_words, mask_language_codes
 from mesa import Model
-from mesa.time import RandomActivation
-import tuning
+import numpy as np
 
-# Initialize id getter
-get_id = id_getter()
+# Keys of the name generators of each kind of agent, under the model's name seed
+ARTICLE_NAMES, AUTHOR_NAMES = range(2)
 
 
 class ArticlesModel(Model):
     """A model with some number of agents"""
 
-    def __init__(self, author_count: int) -> None:
+    def __new__(cls, *args, **kwargs):
+        # Mesa would seed a class-wide python RNG here, which can't take seed sequences
+        return object.__new__(cls)
+
+    def __init__(
+        self,
+        config: Config = None,
+        seed=None,
+        publication_log: PublicationLog = None,
+    ) -> None:
+        """The seed can be an int, a numpy SeedSequence (see utils.random.spawn_seeds) or None for the config's model_seed.
+        Published articles get recorded in the publication log, if there is one
+        """
+
+        # Parameters, which stay the same for the whole run
+        self.config = config or default_config
+
+        # Where published articles get streamed to
+        self.publication_log = publication_log
+
+        # === Randomness
+        self.seed_sequence = as_seed_sequence(
+            seed if seed is not None else self.config.model_seed
+        )
+
+        # Every subsystem draws from its own stream
+        model_seed, author_seed, article_seed, name_seed = self.seed_sequence.spawn(4)
+
+        # Team formation, language picking and activation order
+        self.rng = np.random.default_rng(model_seed)
+
+        # Author creation and language learning
+        self.author_rng = np.random.default_rng(author_seed)
+
+        # Article costs, quality and references
+        self.article_rng = np.random.default_rng(article_seed)
+
+        # Article and author names, each drawn from a generator of its own only when asked for
+        self.name_seed = name_seed
+        self.name_generator = KeyedGenerator(name_seed)
+
+        # Agent id getter
+        self.get_id = id_getter()
+
+        # Compiled article title grammar
+        self.title_generator = title_generator(self.config)
 
         # === Attributes
+        # Month index (see utils.months.month_index) of the current step, None before the first one
+        self.current_month: int = None
+
         self.author_count = 0
         self.active_author_count = 0
-        self.published_articles: list[Article] = []
-        self.yearly_references = {}
-        self.language_weights = language_frequency
+
+        # References made each year, by publish year of the referenced article
+        self.yearly_references = CitationAgeMatrix(self.config.model_years_range)
+
+        # Known languages, indexed by language code
+        self.languages = list(language_frequency.keys())
+
+        # Weight of each language, indexed by language code
+        self.language_weights = np.array(
+            list(language_frequency.values()), dtype=np.float64
+        )
+
+        # Article attributes, stored in columns
+        self.article_store = ArticleStore(self.languages)
+
+        # How many published articles there are in each language
+        self.language_counts = np.zeros(len(self.languages), dtype=np.int64)
+
+        # References of every article, indexed by store row
+        self.citation_graph = CitationGraph()
+
+        # Rows of the articles published during the current step
+        self.published_rows: list[int] = []
+
+        # Article agents, indexed by their store row
+        self.articles: list[Article] = []
 
         # The number of citations of the article that has the most
         self.max_referencing_articles = 0
 
+        # Attractiveness factor of each possible article age, in years
+        self.age_decay = self.config.reference_age_unattractiveness ** np.arange(
+            self.config.model_years_range[1] - self.config.model_years_range[0] + 2
+        )
+
+        # Published article rows, sorted by attractiveness
+        self.ranking = AttractivenessRanking(
+            self.article_store, self.get_attractiveness
+        )
+
+        # Languages of the top articles, for authors picking one to learn
+        self.top_languages = TopLanguages(
+            self.article_store,
+            self.ranking,
+            self.config.language_sampling_pool_size,
+        )
+
+        # Author attributes, stored in columns
+        self.author_store = AuthorStore(len(self.languages))
+
+        # Author agents, indexed by their store row
+        self.authors: list[Author] = []
+
         # List of authors waiting for a new article
         self.new_article_waiting_list: list[Author] = []
 
         # Scheduler
-        self.schedule = RandomActivation(self)
+        self.schedule = EventScheduler(self)
 
-        self.introduce_authors(author_count)
+        self.introduce_authors(self.config.initial_author_count)
 
     # Monthly action
     def step(self, year: int, month: Month) -> None:
         """Advance the model by one step"""
         # Update date
-        self.year = year
-        self.month = month
-
-        # Sort articles by reference count
-        self.published_articles = sorted(
-            self.published_articles,
-            reverse=True,
-            key=lambda article: article.get_attractiveness(),
-        )
+        self.current_month = month_index(year, month)
+
+        # Rank articles by attractiveness
+        self.ranking.refresh(self.current_month, self.max_referencing_articles)
+        self.top_languages.rebuild()
+
+        # Learn and start learning languages
+        self.learn_languages()
 
         # Step agents
         self.schedule.step()
 
+        # Count the citations of everything published
+        self.register_citations()
+
         # Update language weights
         self.update_language_weights()
 
@@ -66,7 +182,74 @@ class ArticlesModel(Model):
         # Empty waiting list
         self.new_article_waiting_list = []
 
-        
+        # Send the month's publications to disk
+        if self.publication_log:
+            self.publication_log.flush()
+
+    def save_checkpoint(self, path: str) -> None:
+        """Saves the whole state of the model between steps, see src.checkpoint"""
+        write_checkpoint(self, path)
+
+    @classmethod
+    def load_checkpoint(
+        cls,
+        path: str,
+        config: Config = None,
+        publication_log: PublicationLog = None,
+    ) -> "ArticlesModel":
+        """Restores a model saved with save_checkpoint. A config can be passed to continue with different parameters"""
+        return read_checkpoint(cls, path, config, publication_log)
+
+    def article_name(self, unique_id: int) -> str:
+        """Title of an article, drawn from its id so it's the same whenever it gets asked for"""
+        return self.title_generator.generate(
+            self.name_generator.get(ARTICLE_NAMES, unique_id)
+        )
+
+    def author_name(self, unique_id: int) -> str:
+        """Name of an author, drawn from its id so it's the same whenever it gets asked for"""
+        return generate_author_name(self.name_generator.get(AUTHOR_NAMES, unique_id))
+
+    @property
+    def year(self) -> int:
+        return self.current_month // 12
+
+    @property
+    def month(self) -> Month:
+        return from_month_index(self.current_month)[0]
+
+    @property
+    def published_articles(self) -> list[Article]:
+        """Published articles, most attractive first"""
+        return [self.articles[row] for row in self.ranking.rows]
+
+    def get_ages(self, rows: np.ndarray) -> np.ndarray:
+        """Ages in whole years of a batch of published articles"""
+        return (self.current_month - self.article_store.publish_month[rows]) // 12
+
+    def get_attractiveness(self, rows: np.ndarray = None) -> np.ndarray:
+        """How likely each of a batch of published articles is to be referenced. Defaults to every published article"""
+        if rows is None:
+            rows = self.ranking.rows
+
+        # Find out proportion between citations / global max number of citations
+        reference_count_ratio = (
+            self.article_store.citations[rows] / self.max_referencing_articles
+            if self.max_referencing_articles > 0
+            else 0
+        )
+
+        # Apply quality/reference count
+        attractiveness = (
+            reference_count_ratio * self.config.reference_count_attractability
+            + self.article_store.quality[rows]
+            * (1 - self.config.reference_count_attractability)
+        )
+
+        # Apply age factor
+        ages = np.minimum(self.get_ages(rows), len(self.age_decay) - 1)
+
+        return attractiveness * self.age_decay[ages]
 
     def apply_for_article(self, author: Author):
         """Registers the author in a waiting list for new article project distributions"""
@@ -74,188 +257,378 @@ class ArticlesModel(Model):
 
     def publish(self, article: Article) -> None:
         """Publish the provided article"""
-        article.publish_date = (self.month, self.year)
+        self.article_store.publish_month[article.row] = self.current_month
 
         # Add it to published list
-        self.published_articles.append(article)
+        self.ranking.add(article.row)
+        self.language_counts[self.article_store.language[article.row]] += 1
+
+        # Log it
+        if self.publication_log:
+            self.publication_log.record(article)
 
         # Set it's authors as idle
         for author in article.authors:
             author.working_on = None
+            author.wake_up()
+
+        # Its references get registered along with the rest of the step's, see register_citations
+        self.published_rows.append(article.row)
 
-        # Register references
-        for reference in article.references:
-            reference.referencing_articles.append(article)
+    def register_citations(self) -> None:
+        """Counts the references of every article published during the step, all at once.
+        Nothing reads citation counts while agents step, so this is the same as counting them on each publication
+        """
+        if not self.published_rows:
+            return
 
-            # Keep the max number updated
-            if len(reference.referencing_articles) > self.max_referencing_articles:
-                self.max_referencing_articles = len(reference.referencing_articles)
+        references = self.citation_graph.references_of(
+            np.array(self.published_rows, dtype=np.int64)
+        )
+        self.published_rows = []
 
-        # Remove from scheduler
-        self.schedule.remove(article)
+        if len(references) == 0:
+            return
 
-    def retire(self, author: Author):
-        # Remove from scheduler
-        self.schedule.remove(author)
+        # Articles can be referenced more than once in a step, or even by the same article
+        citations = self.article_store.citations
+        np.add.at(citations, references, 1)
 
+        self.ranking.mark_changed_many(references)
+
+        # Keep the max number updated
+        self.max_referencing_articles = max(
+            self.max_referencing_articles, int(citations[references].max())
+        )
+
+    def retire(self, author: Author):
         self.active_author_count -= 1
 
     def create_new_articles(self):
         """Creates articles for all authors in the waiting list"""
+        # Index the waiting authors by language
+        waiting_list = WaitingList(self.new_article_waiting_list)
+
+        # Author teams and the language of their article
+        teams: list[tuple[list[Author], str]] = []
+
         # Each iteration assembles a whole author team
-        while len(self.new_article_waiting_list) > 0:
+        while len(waiting_list) > 0:
             # Draw a random author
-            author_team = [self.random.choice(self.new_article_waiting_list)]
+            author_team = [waiting_list.draw(self.rng)]
+            waiting_list.remove(author_team[0])
 
             # Initialize language pool
             language_pool = author_team[0].languages
 
             # Add new authors to the team
-            extra_author_chance = tuning.extra_author_chance
+            extra_author_chance = self.config.extra_author_chance
 
-            while self.random.random() <= extra_author_chance:
+            while self.rng.random() <= extra_author_chance:
                 # Apply chance decay
-                extra_author_chance -= tuning.extra_author_chance_decay
+                extra_author_chance -= self.config.extra_author_chance_decay
 
                 # Try to draw an author that speaks at least one of the languages in the pool
                 extra_author = self.choose_author_that_speaks(
-                    language_pool, exclude=author_team
+                    language_pool, waiting_list
                 )
 
                 # If no authors match the language pool, stop
                 if extra_author is None:
                     break
 
-                # Add author
+                # Add author, taking it out of the waiting list
                 author_team.append(extra_author)
+                waiting_list.remove(extra_author)
 
                 # Update language pool
-                language_pool.update(extra_author.languages)
+                language_pool |= extra_author.languages
+
+            # The first author has always been left speaking every language of its team
+            author_team[0].languages = language_pool
 
-            # Having a team and a language pool, we just need to create the article
-            self.start_article(
-                author_team, self.pick_best_language(list(language_pool))
+            # Having a team and a language pool, we just need to pick the article's language
+            teams.append(
+                (
+                    author_team,
+                    self.pick_best_language(mask_language_codes(language_pool)),
+                )
             )
 
-            # Remove these authors from the waiting list
-            for author in author_team:
-                self.new_article_waiting_list.remove(author)
+        self.start_articles(teams)
+
+    def pick_best_language(self, language_pool: list[int]) -> str:
+        """Among the provided language codes, pick the language expected to reach more people"""
+        # Count how many of the top articles are in each language
+        top_language_counts = np.bincount(
+            self.article_store.language[
+                self.ranking.top(self.config.article_language_evaluation_pool_size)
+            ],
+            minlength=len(self.article_store.languages),
+        )
 
-    def pick_best_language(self, language_pool: list[str]):
-        """Among the provided languages, pick the one expected to reach more people"""
         # Will hold the weights for each language
-        language_weights = [0 for _ in language_pool]
-
-        # Go through the top articles
-        for article in self.published_articles[
-            : tuning.article_language_evaluation_pool_size
-        ]:
-            try:
-                language_index = language_pool.index(article.language)
-                language_weights[language_index] += 1
-            except ValueError:
-                continue
+        language_weights = [
+            int(top_language_counts[language]) for language in language_pool
+        ]
 
         # If no language received a weight, pick randomly
         if sum(language_weights) == 0:
-            return self.random.choice(language_pool)
+            return self.languages[language_pool[self.rng.integers(len(language_pool))]]
 
         # Pick based on weight
-        return weighted_sample(language_pool, language_weights, 1)[0]
+        return self.languages[
+            language_pool[weighted_sample(language_weights, 1, rng=self.rng)[0]]
+        ]
 
     def choose_author_that_speaks(
-        self, language_pool: list[str], exclude: list[Author]
-    ):
-        return next(
-            (
-                # Get author
-                author
-                # From waiting list
-                for author in self.new_article_waiting_list
-                # As long as at least one of his spoken languages is present in the provided pool
-                if any(
-                    author_language
-                    for author_language in author.languages
-                    if author_language in language_pool
-                )
-                and author not in exclude
-                # And isn't excluded
-            ),
-            # If none match, return None
-            None,
+        self, language_pool: int, waiting_list: WaitingList
+    ) -> Author:
+        """Returns the first author in the waiting list that speaks at least one of the languages in the pool bitmask, or None"""
+        return waiting_list.first_speaking(language_pool)
+
+    def start_articles(self, teams: list[tuple[list[Author], str]]) -> list[Article]:
+        """Starts an article for each (authors, language) team"""
+        # Build the reference sampling distribution once for every new article
+        pool_rows = self.ranking.top(self.config.reference_sampling_pool_size)
+
+        reference_sampler = ReferenceSampler(
+            self.ranking.rows,
+            pool_rows,
+            self.get_attractiveness(pool_rows),
+            self.config,
         )
 
-    def start_article(self, authors: list[Author], language: str):
-        # Define article to be created
-        article = Article(
-            # Article agent id
-            get_id(),
-            # Simulation model
-            self,
-            # Article name
-            generate_article_name(),
-            # Authors
-            authors,
-            # Article language
-            language,
+        references = reference_sampler.sample(len(teams), self.article_rng)
+
+        # Get article time costs
+        costs = skewed_range_many(
+            self.config.article_cost_range[0],
+            self.config.article_cost_range[1],
+            self.config.article_cost_skew,
+            True,
+            len(teams),
+            self.article_rng,
         )
 
-        # Add article to scheduler
-        self.schedule.add(article)
+        articles = []
+
+        for (authors, language), article_references, cost in zip(
+            teams, references, costs.tolist()
+        ):
+            # Define article to be created
+            article = Article(
+                # Article agent id
+                self.get_id(),
+                # Simulation model
+                self,
+                # Authors
+                authors,
+                # Article language
+                language,
+                # Referenced article rows
+                article_references,
+                # Months of work it takes
+                cost,
+            )
+
+            # Register article
+            self.articles.append(article)
+
+            # File article under the month it will be complete
+            self.schedule.add_event(article, cost)
+
+            # Set authors as working on this article
+            for author in authors:
+                author.working_on = article
+
+                # Authors get activated along with their article, in random order, as they'd only
+                # start a new one on the same month if activated after it gets published
+                self.schedule.add_event(author, cost)
 
-        # print("starting" + article.name)
+            articles.append(article)
 
-        # Set authors as working on this article
-        for author in authors:
-            author.working_on = article
+        # Count the whole batch's references at once
+        if references:
+            self.count_references(np.concatenate(references))
 
-        return article
+        return articles
+
+    def count_references(self, reference_rows: np.ndarray) -> None:
+        """Registers the publish years of the articles referenced this year"""
+        self.yearly_references.add(
+            self.current_month // 12,
+            self.article_store.publish_month[reference_rows] // 12,
+        )
 
     def introduce_authors(self, count: int = None):
         generate_count = (
             count
             if count
             else skewed_range(
-                tuning.new_author_range[0],
-                tuning.new_author_range[1],
-                tuning.new_author_skew,
+                self.config.new_author_range[0],
+                self.config.new_author_range[1],
+                self.config.new_author_skew,
                 True,
+                self.author_rng,
+            )
+        )
+
+        # Draw the whole cohort's competencies, skewed to the medium, and lifespans
+        competencies = skewed_random_many(
+            self.config.author_competency_skew, generate_count, self.author_rng
+        )
+
+        lifespans = skewed_range_many(
+            self.config.author_lifespan_range[0],
+            self.config.author_lifespan_range[1],
+            self.config.author_lifespan_skew,
+            True,
+            generate_count,
+            self.author_rng,
+        )
+
+        # Everyone speaks one language, plus each extra one with a fixed chance
+        language_counts = np.minimum(
+            self.author_rng.geometric(
+                1 - self.config.chance_of_extra_language, generate_count
+            ),
+            len(self.languages),
+        )
+
+        # Pick them by weight, without repeating any for the same author
+        spoken_languages = weighted_sample_many(
+            self.language_weights, language_counts.tolist(), self.author_rng
+        )
+
+        known = np.zeros((generate_count, len(self.languages)), dtype=bool)
+        known[
+            np.repeat(np.arange(generate_count), language_counts),
+            np.concatenate(spoken_languages),
+        ] = True
+
+        # The first chance of starting to learn a language comes along with their first activation
+        current_step = self.schedule.current_step
+
+        rows = self.author_store.append_many(
+            competencies,
+            lifespans,
+            boolean_mask_words(known),
+            current_step + self.draw_months_until_attempts(generate_count),
+        )
+
+        for row, competency in zip(rows.tolist(), competencies.tolist()):
+            author = Author(self.get_id(), self, row, competency)
+            self.authors.append(author)
+
+            # Authors are only activated when they have something to do, starting with applying for an article
+            self.schedule.add_event(author, 1)
+
+        # Count authors
+        self.author_count += generate_count
+        self.active_author_count += generate_count
+
+    def learn_languages(self) -> None:
+        """Carries out every author's language learning for the step, before any agent acts: authors done
+        learning a language start speaking it, and authors on their chance to start learning one pick it.
+        Retired authors don't learn
+        """
+        author_store = self.author_store
+        current_step = self.schedule.current_step
+
+        active = author_store.articles_left > 0
+        learning = author_store.learning_language != NONE
+
+        # Finish learning, and wait for the next chance to begin again
+        done_rows = np.flatnonzero(
+            active & learning & (author_store.learning_done_step <= current_step)
+        )
+
+        if len(done_rows):
+            author_store.add_languages(
+                done_rows, author_store.learning_language[done_rows]
+            )
+            author_store.learning_language[done_rows] = NONE
+            author_store.next_attempt_step[done_rows] = (
+                current_step + self.draw_months_until_attempts(len(done_rows))
             )
+
+        # Start learning something new
+        attempt_rows = np.flatnonzero(
+            active & ~learning & (author_store.next_attempt_step <= current_step)
+        )
+
+        if not len(attempt_rows):
+            return
+
+        languages = np.full(len(attempt_rows), NONE, dtype=np.int64)
+
+        # Chance to learn english regardless of top articles
+        english = self.article_store.language_codes["English"]
+        lacking_english = np.flatnonzero(~author_store.speak(attempt_rows, english))
+
+        languages[lacking_english] = np.where(
+            self.author_rng.random(len(lacking_english))
+            <= self.config.language_learning_english_bias,
+            english,
+            NONE,
         )
 
-        for _ in range(generate_count):
-            author = Author(get_id(), self)
+        # Otherwise, sample from the top languages each author doesn't know
+        sampling = np.flatnonzero(languages == NONE)
 
-            # Count author
-            self.author_count += 1
-            self.active_author_count += 1
+        languages[sampling] = self.top_languages.sample_many(
+            author_store.language_words[attempt_rows[sampling]], self.author_rng
+        )
+
+        starting = languages != NONE
+        starting_rows = attempt_rows[starting]
+
+        # Set how long it will take to learn each language
+        learning_months = skewed_range_many(
+            self.config.language_learning_duration_range[0],
+            self.config.language_learning_duration_range[1],
+            self.config.language_learning_duration_skew,
+            True,
+            len(starting_rows),
+            self.author_rng,
+        )
+
+        author_store.learning_language[starting_rows] = languages[starting]
+        author_store.learning_done_step[starting_rows] = current_step + learning_months
 
-            # Add author to scheduler
-            self.schedule.add(author)
+        # If no languages available, too bad!
+        waiting_rows = attempt_rows[~starting]
+
+        author_store.next_attempt_step[waiting_rows] = (
+            current_step + self.draw_months_until_attempts(len(waiting_rows))
+        )
+
+    def draw_months_until_attempts(self, count: int) -> np.ndarray:
+        """Steps until each of count authors gets its next chance to start learning a language, given one per step"""
+        # They follow a geometric distribution
+        return self.author_rng.geometric(
+            self.config.begin_learning_language_chance, count
+        )
 
     def update_language_weights(self):
         # Will hold this month's language weights
-        month_weights = {}
+        if self.config.language_evaluation_windowed:
+            # Only look up the languages of the top articles
+            month_weights = np.bincount(
+                self.article_store.language[
+                    self.ranking.top(self.config.language_evaluation_pool_size)
+                ],
+                minlength=len(self.languages),
+            )
 
-        # Look up the languages in a batch of articles
-        for article in self.published_articles:
-            # Ensure this language is in dict
-            if not month_weights.get(article.language):
-                month_weights[article.language] = 1
-            else:
-                month_weights[article.language] += 1
+        else:
+            month_weights = self.language_counts
 
         # Update the model's language weights
-        for language in self.language_weights.keys():
-            # Get the month's influence over the weight
-            language_month_weight = tuning.language_update_speed * (
-                month_weights.get(language) or 0
-            )
+        self.language_weights = (
+            # The month's influence over the weight
+            self.config.language_update_speed * month_weights
             # The original weight's influence
-            language_original_weight = (
-                1 - tuning.language_update_speed
-            ) * self.language_weights[language]
-
-            self.language_weights[language] = (
-                language_month_weight + language_original_weight
-            )
+            + (1 - self.config.language_update_speed) * self.language_weights
+        )
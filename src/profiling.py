@@ -0,0 +1,256 @@
+from cProfile import Profile
+from pstats import Stats
+from time import perf_counter
+from src.article import Article
+from src.author import Author
+import src.model
+import src.reference_sampler
+from utils.article_name_generator import TitleGenerator
+import tracemalloc
+
+# Phases of ArticlesModel.step, as (name, owner attribute, method) where an owner of None is the model itself
+phases = (
+    ("sort", "ranking", "refresh"),
+    ("top_languages", "top_languages", "rebuild"),
+    ("learn_languages", None, "learn_languages"),
+    ("schedule_step", "schedule", "step"),
+    ("register_citations", None, "register_citations"),
+    ("update_language_weights", None, "update_language_weights"),
+    ("introduce_authors", None, "introduce_authors"),
+    ("create_new_articles", None, "create_new_articles"),
+)
+
+# Model methods called many times per step
+model_helpers = (
+    "get_attractiveness",
+    "choose_author_that_speaks",
+    "article_name",
+    "author_name",
+)
+
+# Functions called many times per step, as (name, modules that call them)
+function_helpers = (
+    ("weighted_sample", (src.model,)),
+    ("weighted_sample_many", (src.reference_sampler, src.model)),
+)
+
+# Methods of other classes to time, as (name, class)
+method_helpers = (("generate", TitleGenerator),)
+
+# Agent classes whose step gets timed
+agent_classes = (Author, Article)
+
+
+class Profiler:
+    """Opt-in timers for a model's step, its phases and, when detailed, agent steps and hot helpers.
+    Attaching wraps the timed methods and functions, and detaching puts the originals back, so a model
+    that is not being profiled runs exactly the code it would without this module.
+    Agent steps and helpers are wrapped process-wide, so they also count calls from other models while attached.
+    Timings are inclusive: a phase's time includes the helpers it calls
+    """
+
+    def __init__(
+        self,
+        detailed: bool = True,
+        capture_years: tuple[int, int] = None,
+        cprofile: bool = False,
+        trace_memory: bool = False,
+    ) -> None:
+        # Whether to time agent steps and helpers, and not only the phases
+        self.detailed = detailed
+
+        # Years, end excluded, to run cProfile and/or tracemalloc on
+        self.capture_years = capture_years
+        self.cprofile = cprofile
+        self.trace_memory = trace_memory
+
+        # Cumulative seconds and calls of each timer
+        self.seconds: dict[str, float] = {}
+        self.calls: dict[str, int] = {}
+
+        # Seconds and calls of each timer on each step
+        self.monthly_seconds: dict[str, list[float]] = {}
+        self.monthly_calls: dict[str, list[int]] = {}
+
+        # (year, month) of each step, in the same order
+        self.months: list[tuple[int, int]] = []
+
+        # Results of the capture, once it ends
+        self.cprofile_stats: Stats = None
+        self.memory_snapshot: tracemalloc.Snapshot = None
+        self.memory_peak: int = None
+
+        # Replaced attributes, as (owner, attribute, original, whether the owner had it itself)
+        self._patches: list[tuple[object, str, object, bool]] = []
+
+        self._profile: Profile = None
+        self._capturing = False
+
+    def attach(self, model) -> "Profiler":
+        """Starts timing a model"""
+        self._add_timer("step", model, "step", self._timed_step)
+
+        for name, owner_name, method_name in phases:
+            owner = getattr(model, owner_name) if owner_name else model
+            self._add_timer(name, owner, method_name)
+
+        if self.detailed:
+            for agent_class in agent_classes:
+                self._add_timer(f"{agent_class.__name__}.step", agent_class, "step")
+
+            for name in model_helpers:
+                self._add_timer(name, model, name)
+
+            for name, owner_class in method_helpers:
+                self._add_timer(f"{owner_class.__name__}.{name}", owner_class, name)
+
+            # The ranking keeps its own reference to get_attractiveness
+            self._patch(model.ranking, "attractiveness", model.get_attractiveness)
+
+            # Functions get imported by name, so every importer gets the same timed version
+            for name, modules in function_helpers:
+                self._register(name)
+                timed_function = self._timed(getattr(modules[0], name), name)
+
+                for module in modules:
+                    self._patch(module, name, timed_function)
+
+        return self
+
+    def detach(self) -> None:
+        """Stops timing, putting every original method back"""
+        self._stop_capture()
+
+        for owner, attribute, original, owned in reversed(self._patches):
+            if owned:
+                setattr(owner, attribute, original)
+            else:
+                delattr(owner, attribute)
+
+        self._patches = []
+
+    def __enter__(self) -> "Profiler":
+        return self
+
+    def __exit__(self, *exception) -> None:
+        self.detach()
+
+    def stats(self) -> dict[str, dict]:
+        """Cumulative and per step seconds and calls of each timer"""
+        return {
+            name: {
+                "calls": self.calls[name],
+                "seconds": self.seconds[name],
+                "seconds_per_call": (
+                    self.seconds[name] / self.calls[name] if self.calls[name] else 0.0
+                ),
+                "monthly_calls": self.monthly_calls[name],
+                "monthly_seconds": self.monthly_seconds[name],
+            }
+            for name in self.seconds
+        }
+
+    def report(self) -> str:
+        """Cumulative timings as a text table, slowest first"""
+        lines = [f"{'timer':<28}{'calls':>12}{'seconds':>12}{'ms/call':>12}"]
+
+        for name, timer in sorted(
+            self.stats().items(), key=lambda item: -item[1]["seconds"]
+        ):
+            lines.append(
+                f"{name:<28}{timer['calls']:>12}{timer['seconds']:>12.3f}"
+                f"{1000 * timer['seconds_per_call']:>12.4f}"
+            )
+
+        return "\n".join(lines)
+
+    def _add_timer(self, name: str, owner, attribute: str, wrapper=None) -> None:
+        self._register(name)
+
+        self._patch(
+            owner, attribute, (wrapper or self._timed)(getattr(owner, attribute), name)
+        )
+
+    def _register(self, name: str) -> None:
+        self.seconds[name] = 0.0
+        self.calls[name] = 0
+        self.monthly_seconds[name] = []
+        self.monthly_calls[name] = []
+
+    def _patch(self, owner, attribute: str, value) -> None:
+        self._patches.append(
+            (owner, attribute, getattr(owner, attribute), attribute in vars(owner))
+        )
+        setattr(owner, attribute, value)
+
+    def _timed(self, function, name: str):
+        seconds = self.seconds
+        calls = self.calls
+
+        def timed(*args, **kwargs):
+            start = perf_counter()
+
+            try:
+                return function(*args, **kwargs)
+            finally:
+                seconds[name] += perf_counter() - start
+                calls[name] += 1
+
+        return timed
+
+    def _timed_step(self, step, name: str):
+        timed_step = self._timed(step, name)
+
+        def profiled_step(year: int, month) -> None:
+            # Start or end the capture as the run enters or leaves its years
+            if self.capture_years and (self.cprofile or self.trace_memory):
+                if self.capture_years[0] <= year < self.capture_years[1]:
+                    self._start_capture()
+                else:
+                    self._stop_capture()
+
+            previous_seconds = dict(self.seconds)
+            previous_calls = dict(self.calls)
+
+            timed_step(year, month)
+
+            # File what this step took
+            for timer_name in self.seconds:
+                self.monthly_seconds[timer_name].append(
+                    self.seconds[timer_name] - previous_seconds[timer_name]
+                )
+                self.monthly_calls[timer_name].append(
+                    self.calls[timer_name] - previous_calls[timer_name]
+                )
+
+            self.months.append((year, month.value))
+
+        return profiled_step
+
+    def _start_capture(self) -> None:
+        if self._capturing:
+            return
+
+        self._capturing = True
+
+        if self.trace_memory:
+            tracemalloc.start()
+
+        if self.cprofile:
+            self._profile = Profile()
+            self._profile.enable()
+
+    def _stop_capture(self) -> None:
+        if not self._capturing:
+            return
+
+        self._capturing = False
+
+        if self.cprofile:
+            self._profile.disable()
+            self.cprofile_stats = Stats(self._profile)
+
+        if self.trace_memory:
+            self.memory_snapshot = tracemalloc.take_snapshot()
+            self.memory_peak = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
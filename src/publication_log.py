@@ -0,0 +1,167 @@
+from queue import Queue
+from threading import Thread
+from typing import Iterator
+from src.article import Article
+from utils.months import Month, month_index
+import csv
+import io
+import os
+
+# Columns of the log, one row per published article
+columns = [
+    "row",
+    "unique_id",
+    "name",
+    "year",
+    "month",
+    "references",
+    "language",
+    "authors",
+    "quality",
+]
+
+
+class PublicationLog:
+    """Append-only csv log of published articles. Rows are buffered for a month and then written by a background thread,
+    so the simulation never waits on the disk and a crash only loses the months that were not written yet.
+    A new log replaces any file at its path. To continue a run from a checkpoint, pass the checkpoint's month
+    (see src.checkpoint.checkpoint_month) as resume_month: the rows of that month and earlier ones are kept,
+    and any later ones, written before the run was interrupted, are dropped.
+    The file is only touched on the first flush, so a log a checkpoint refuses to continue with is left as it was
+    """
+
+    def __init__(
+        self, path: str, max_pending_months: int = 64, resume_month: int = None
+    ) -> None:
+        self.path = path
+
+        # Month index the log continues after, or None for a new log
+        self.resume_month = resume_month
+
+        # Rows of the month being simulated
+        self._month_rows: list[dict] = []
+
+        # Months waiting to be written. Bounded, so a slow disk slows the simulation down instead of filling memory
+        self._queue: Queue = Queue(max_pending_months)
+
+        # Error raised by the writer thread, if any
+        self._error: Exception = None
+
+        # Opened on the first flush
+        self._output_file = None
+        self._writer: csv.DictWriter = None
+        self._thread: Thread = None
+
+    def record(self, article: Article) -> None:
+        """Buffers the row of an article that was just published"""
+        model = article.model
+
+        self._month_rows.append(
+            {
+                "row": article.row,
+                "unique_id": article.unique_id,
+                "name": article.name,
+                "year": model.year,
+                "month": model.month.name,
+                "references": len(article.references),
+                "language": article.language,
+                "authors": [author.name for author in article.authors],
+                "quality": float(article.quality),
+            }
+        )
+
+    def flush(self) -> None:
+        """Hands the buffered month over to the writer thread"""
+        self._raise_error()
+
+        if self._thread is None:
+            self._open()
+
+        if self._month_rows:
+            self._queue.put(self._month_rows)
+            self._month_rows = []
+
+    def close(self) -> None:
+        """Writes everything that is left and waits for the writer thread to finish"""
+        self.flush()
+
+        # Tell the writer to stop
+        self._queue.put(None)
+        self._thread.join()
+
+        self._output_file.close()
+        self._raise_error()
+
+    def _open(self) -> None:
+        """Starts the file over, with the rows kept from the existing log if resuming, and starts the writer thread"""
+        kept_rows = (
+            self._rows_up_to(self.path, self.resume_month)
+            if self.resume_month is not None
+            else []
+        )
+
+        self._output_file = open(self.path, "w", newline="")
+        self._writer = csv.DictWriter(self._output_file, fieldnames=columns)
+        self._writer.writeheader()
+        self._writer.writerows(kept_rows)
+        self._output_file.flush()
+
+        self._thread = Thread(target=self._write, name="publication-log", daemon=True)
+        self._thread.start()
+
+    def _write(self) -> None:
+        while True:
+            month_rows = self._queue.get()
+
+            # Closed
+            if month_rows is None:
+                return
+
+            # After an error, keep draining so the simulation never blocks
+            if self._error:
+                continue
+
+            try:
+                self._writer.writerows(month_rows)
+                self._output_file.flush()
+
+            except Exception as error:
+                self._error = error
+
+    @staticmethod
+    def _rows_up_to(path: str, last_month: int) -> list[dict]:
+        """Rows of an existing log published on last_month or before. Incomplete rows, cut off by a crash, are dropped"""
+        if not os.path.exists(path):
+            return []
+
+        with open(path, newline="") as input_file:
+            text = input_file.read()
+
+        # A crash can leave the last line half written
+        text = text[: text.rfind("\n") + 1]
+
+        return [
+            log_row
+            for log_row in csv.DictReader(io.StringIO(text))
+            if None not in log_row.values()
+            and month_index(int(log_row["year"]), Month[log_row["month"]]) <= last_month
+        ]
+
+    def _raise_error(self) -> None:
+        if self._error:
+            raise self._error
+
+    def __enter__(self) -> "PublicationLog":
+        return self
+
+    def __exit__(self, *exception) -> None:
+        self.close()
+
+
+def read_publication_log(path: str) -> Iterator[dict]:
+    """Yields the rows of a publication log in publication order. Row numbers come back as ints, everything else as text"""
+    with open(path, newline="") as input_file:
+        for log_row in csv.DictReader(input_file):
+            log_row["row"] = int(log_row["row"])
+
+            yield log_row
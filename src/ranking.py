@@ -0,0 +1,143 @@
+from typing import Callable
+from src.article_store import ArticleStore
+import numpy as np
+
+
+class AttractivenessRanking:
+    """Keeps published article rows sorted by attractiveness, only reordering the ones that changed"""
+
+    def __init__(
+        self,
+        article_store: ArticleStore,
+        attractiveness: Callable[[np.ndarray], np.ndarray],
+    ) -> None:
+        self.article_store = article_store
+
+        # Gives the attractiveness of a batch of article rows
+        self.attractiveness = attractiveness
+
+        # Ranked article rows, most attractive first
+        self._ranked = np.zeros(0, dtype=np.int64)
+
+        # Negated attractiveness of each ranked row, in the same order (ascending, for searchsorted)
+        self._keys = np.zeros(0, dtype=np.float64)
+
+        # Rows that were published since the last refresh. They sit unranked at the end
+        self._pending: list[int] = []
+
+        # Ranked rows that gained citations since the last refresh
+        self._changed: list[int] = []
+
+        # Ranked rows followed by pending rows, built on demand
+        self._rows: np.ndarray = self._ranked
+
+        # The max number of citations the current keys were computed with
+        self._max_referencing_articles = 0
+
+    def __len__(self) -> int:
+        return len(self._ranked) + len(self._pending)
+
+    @property
+    def rows(self) -> np.ndarray:
+        """Published article rows, most attractive first, followed by the ones published since the last refresh"""
+        if len(self._rows) != len(self):
+            self._rows = np.concatenate(
+                (self._ranked, np.array(self._pending, dtype=np.int64))
+            )
+
+        return self._rows
+
+    def top(self, count: int) -> np.ndarray:
+        """Returns the count most attractive article rows"""
+        if count <= len(self._ranked):
+            return self._ranked[:count]
+
+        return self.rows[:count]
+
+    def add(self, row: int) -> None:
+        """Registers a newly published row. It stays at the end of the list until the next refresh"""
+        self._pending.append(row)
+
+    def mark_changed_many(self, rows: np.ndarray) -> None:
+        """Flags a batch of rows whose attractiveness changed, so they get reordered on the next refresh"""
+        self._changed.extend(rows.tolist())
+
+    def refresh(self, current_month: int, max_referencing_articles: int) -> None:
+        """Brings the ranking up to date with the current month index"""
+        # A new max citation count changes every article's citation ratio
+        if max_referencing_articles != self._max_referencing_articles:
+            self._rebuild()
+
+        else:
+            # Otherwise ages only tick over for articles published a whole number of years ago (see ArticlesModel.get_ages)
+            moving = np.zeros(len(self.article_store), dtype=bool)
+            moving[self._changed] = True
+            moving[self._ranked] |= (
+                self.article_store.publish_month[self._ranked] % 12
+                == current_month % 12
+            )
+
+            moving = moving[self._ranked]
+
+            if np.count_nonzero(moving) > len(self._ranked) // 4:
+                self._rebuild()
+            else:
+                self._reorder(moving)
+
+        self._max_referencing_articles = max_referencing_articles
+
+        self._pending = []
+        self._changed = []
+        self._rows = self._ranked
+
+    def get_state(self) -> dict[str, np.ndarray]:
+        """Everything needed to pick the ranking up where it is"""
+        return {
+            "ranked": self._ranked,
+            "keys": self._keys,
+            "pending": np.array(self._pending, dtype=np.int64),
+            "changed": np.array(self._changed, dtype=np.int64),
+            "max_referencing_articles": np.array(self._max_referencing_articles),
+        }
+
+    def set_state(self, state: dict[str, np.ndarray]) -> None:
+        """Restores a state from get_state"""
+        self._ranked = state["ranked"].astype(np.int64)
+        self._keys = state["keys"].astype(np.float64)
+        self._pending = state["pending"].tolist()
+        self._changed = state["changed"].tolist()
+        self._max_referencing_articles = int(state["max_referencing_articles"])
+
+        self._rows = self._ranked
+
+    def _rebuild(self) -> None:
+        """Recomputes every key and sorts the whole array"""
+        rows = self.rows
+        keys = -self.attractiveness(rows)
+
+        order = np.argsort(keys, kind="stable")
+
+        self._ranked = rows[order]
+        self._keys = keys[order]
+
+    def _reorder(self, moving: np.ndarray) -> None:
+        """Moves only the flagged ranked rows, and files the pending ones"""
+        # Take moving rows out of the ranking
+        kept_rows = self._ranked[~moving]
+        kept_keys = self._keys[~moving]
+
+        # Compute keys for them and for the new rows
+        moving_rows = np.concatenate(
+            (self._ranked[moving], np.array(self._pending, dtype=np.int64))
+        )
+        moving_keys = -self.attractiveness(moving_rows)
+
+        order = np.argsort(moving_keys, kind="stable")
+        moving_rows = moving_rows[order]
+        moving_keys = moving_keys[order]
+
+        # Merge them back in
+        positions = np.searchsorted(kept_keys, moving_keys, side="right")
+
+        self._ranked = np.insert(kept_rows, positions, moving_rows)
+        self._keys = np.insert(kept_keys, positions, moving_keys)
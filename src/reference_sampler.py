@@ -0,0 +1,93 @@
+from utils.random import skewed_range_many, weighted_sample_many
+from src.config import Config
+import numpy as np
+
+
+class ReferenceSampler:
+    """Draws references for new articles. Its sampling distribution is built once, and shared by every article started in the same step"""
+
+    def __init__(
+        self,
+        published_rows: np.ndarray,
+        pool_rows: np.ndarray,
+        pool_weights: np.ndarray,
+        config: Config,
+    ) -> None:
+        # Every article that can be referenced
+        self.published_rows = published_rows
+
+        # Top articles, which get sampled by weight
+        self.pool_rows = pool_rows
+
+        # Weights for sampling the pool
+        self.pool_weights = pool_weights
+
+        # Reference count and randomness parameters
+        self.config = config
+
+    def draw_reference_counts(
+        self, article_count: int, rng: np.random.Generator
+    ) -> list[int]:
+        """How many references each of article_count new articles will have"""
+        # There is nothing to reference yet
+        if len(self.published_rows) == 0:
+            return [0] * article_count
+
+        reference_counts = np.round(
+            skewed_range_many(
+                self.config.reference_count_range[0],
+                self.config.reference_count_range[1],
+                self.config.reference_count_skew,
+                True,
+                article_count,
+                rng,
+            )
+            # Smooth out reference count on the first years
+            * self.config.reference_chance_modifier(len(self.published_rows))
+        )
+
+        # Ensure there's enough articles for this
+        return (
+            np.minimum(reference_counts, len(self.published_rows)).astype(int).tolist()
+        )
+
+    def sample(self, article_count: int, rng: np.random.Generator) -> list[np.ndarray]:
+        """Draws the reference rows of article_count new articles"""
+        reference_counts = self.draw_reference_counts(article_count, rng)
+
+        # Find out how many samples of each article will be random
+        random_sample_counts = [
+            round(self.config.reference_randomly_chance * reference_count)
+            for reference_count in reference_counts
+        ]
+
+        # Weighted samples for every article at once
+        weighted_samples = weighted_sample_many(
+            self.pool_weights,
+            [
+                reference_count - random_sample_count
+                for reference_count, random_sample_count in zip(
+                    reference_counts, random_sample_counts
+                )
+            ],
+            rng,
+        )
+
+        references = []
+
+        for article_index in range(article_count):
+            # Get random samples
+            random_rows = self.published_rows[
+                rng.choice(
+                    len(self.published_rows),
+                    random_sample_counts[article_index],
+                    replace=False,
+                )
+            ]
+
+            # Get weighted samples from the pool
+            weighted_rows = self.pool_rows[weighted_samples[article_index]]
+
+            references.append(np.concatenate((random_rows, weighted_rows)))
+
+        return references
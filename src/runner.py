@@ -0,0 +1,146 @@
+from argparse import ArgumentParser
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Callable, Iterator
+from src.config import Config, default_config
+from src.model import ArticlesModel
+from utils.months import Month
+from utils.random import spawn_seeds
+import csv
+import numpy as np
+
+# Normal quantile for 95% confidence intervals
+confidence_z = 1.96
+
+
+def run_model(
+    model: ArticlesModel,
+    years_range: tuple[int, int] = None,
+    on_year: Callable[[ArticlesModel, int], None] = None,
+) -> ArticlesModel:
+    """Steps the model through every month of the years range. on_year is called at the end of each year"""
+    years_range = years_range or model.config.model_years_range
+
+    # For each year
+    for year in range(years_range[0], years_range[1]):
+        # For each month
+        for month_index in range(1, 13):
+            # Advance the month
+            model.step(year, Month(month_index))
+
+        if on_year:
+            on_year(model, year)
+
+    return model
+
+
+def run_replicate(config: Config, seed) -> dict:
+    """Runs a whole simulation and returns a small summary of it, rather than the model itself"""
+    model = ArticlesModel(config, seed)
+
+    # Published articles per language at the end of each year
+    yearly_language_counts = []
+
+    run_model(
+        model,
+        on_year=lambda model, year: yearly_language_counts.append(
+            model.language_counts.copy()
+        ),
+    )
+
+    return {
+        "entropy": model.seed_sequence.entropy,
+        "spawn_key": model.seed_sequence.spawn_key,
+        "years": list(range(*config.model_years_range)),
+        "languages": model.languages,
+        "yearly_language_counts": np.array(yearly_language_counts),
+        "article_count": len(model.ranking),
+        "author_count": model.author_count,
+    }
+
+
+def run_replicates(
+    config: Config, n: int, workers: int = None, seed=None
+) -> Iterator[dict]:
+    """Runs n independent replicates in a process pool, each with its own seed, and yields their summaries as they finish"""
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = [
+            executor.submit(run_replicate, config, replicate_seed)
+            for replicate_seed in spawn_seeds(seed, n)
+        ]
+
+        for future in as_completed(futures):
+            yield future.result()
+
+
+def summarize_replicates(summaries: list[dict]) -> list[dict]:
+    """Combines replicate summaries into a table of mean language shares per year, with 95% confidence intervals"""
+    languages = summaries[0]["languages"]
+    years = summaries[0]["years"]
+
+    # Share of published articles per replicate, year and language
+    counts = np.array([summary["yearly_language_counts"] for summary in summaries])
+    totals = counts.sum(axis=2, keepdims=True)
+
+    shares = np.divide(counts, totals, out=np.zeros(counts.shape), where=totals > 0)
+
+    mean = shares.mean(axis=0)
+
+    # Normal approximation of the mean's confidence interval
+    margin = (
+        confidence_z * shares.std(axis=0, ddof=1) / np.sqrt(len(summaries))
+        if len(summaries) > 1
+        else np.zeros(mean.shape)
+    )
+
+    table = []
+
+    for year_index, year in enumerate(years):
+        for language_code, language in enumerate(languages):
+            # Skip languages nobody published in
+            if not counts[:, year_index, language_code].any():
+                continue
+
+            table.append(
+                {
+                    "year": year,
+                    "language": language,
+                    "mean_share": mean[year_index, language_code],
+                    "ci_low": mean[year_index, language_code]
+                    - margin[year_index, language_code],
+                    "ci_high": mean[year_index, language_code]
+                    + margin[year_index, language_code],
+                    "replicates": len(summaries),
+                }
+            )
+
+    return table
+
+
+def write_table(table: list[dict], path: str) -> None:
+    """Writes a list of rows with the same keys to a csv file"""
+    with open(path, "w", newline="") as output_file:
+        writer = csv.DictWriter(output_file, fieldnames=list(table[0].keys()))
+        writer.writeheader()
+        writer.writerows(table)
+
+
+if __name__ == "__main__":
+    parser = ArgumentParser(description="Runs independent replicates of the model")
+    parser.add_argument("-n", "--replicates", type=int, default=10)
+    parser.add_argument("-w", "--workers", type=int, default=None)
+    parser.add_argument("-s", "--seed", type=int, default=default_config.model_seed)
+    parser.add_argument("-o", "--output", default="replicates.csv")
+    arguments = parser.parse_args()
+
+    summaries = []
+
+    for summary in run_replicates(
+        default_config, arguments.replicates, arguments.workers, arguments.seed
+    ):
+        summaries.append(summary)
+
+        print(
+            f"Replicate {len(summaries)}/{arguments.replicates}: {summary['article_count']} articles, {summary['author_count']} authors"
+        )
+
+    write_table(summarize_replicates(summaries), arguments.output)
@@ -0,0 +1,68 @@
+from typing import Protocol
+from mesa import Model
+from mesa.time import BaseScheduler
+
+
+class Agent(Protocol):
+    """Anything the scheduler can activate. Agents don't need to be mesa Agents"""
+
+    unique_id: int
+
+    def step(self) -> None: ...
+
+
+class EventScheduler(BaseScheduler):
+    """Activates added agents every step in random order, like RandomActivation.
+    Agents can also be filed under a future step instead, and are then only activated on that step
+    """
+
+    def __init__(self, model: Model) -> None:
+        super().__init__(model)
+
+        # Agents filed under the step they are due on. Filing the same agent twice for a step activates it once
+        self._calendar: dict[int, dict[Agent, None]] = {}
+
+        # Whether a step is currently running
+        self._stepping = False
+
+    @property
+    def current_step(self) -> int:
+        """The step that is running, or the last one that ran if none is"""
+        return self.steps if self._stepping else self.steps - 1
+
+    def add_event(self, agent: Agent, delay: int) -> None:
+        """Files an agent to be activated once, delay steps after the current one"""
+        due_step = self.current_step + max(delay, 1)
+        self._calendar.setdefault(due_step, {})[agent] = None
+
+    def step(self) -> None:
+        """Activates every added agent and every agent due on this step, shuffled together"""
+        due_agents = self._calendar.pop(self.steps, {})
+
+        agents = list(self._agents.values()) + list(due_agents)
+        self.model.rng.shuffle(agents)
+
+        self._stepping = True
+
+        for agent in agents:
+            # Skip added agents that were removed along the way
+            if agent.unique_id in self._agents or agent in due_agents:
+                agent.step()
+
+        self._stepping = False
+
+        self.steps += 1
+        self.time += 1
+
+    def get_events(self) -> list[tuple[int, Agent]]:
+        """Every future activation as a (step, agent) pair, in the order they were filed"""
+        return [
+            (step, agent) for step, agents in self._calendar.items() for agent in agents
+        ]
+
+    def set_events(self, events: list[tuple[int, Agent]]) -> None:
+        """Replaces the future activations with the ones from get_events"""
+        self._calendar = {}
+
+        for step, agent in events:
+            self._calendar.setdefault(step, {})[agent] = None
@@ -0,0 +1,164 @@
+from argparse import ArgumentParser
+from ast import literal_eval
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dataclasses import fields
+from itertools import product
+from typing import Iterable, Iterator
+from src.config import Config, default_config
+from src.runner import run_replicate, write_table
+from utils.random import as_seed_sequence, spawn_seeds
+import numpy as np
+
+# Declared type of each Config parameter
+config_field_types = {field.name: field.type for field in fields(Config)}
+
+
+def grid_design(values: dict[str, Iterable]) -> list[dict]:
+    """Every combination of the given values for each parameter"""
+    names = list(values.keys())
+
+    return [
+        dict(zip(names, combination))
+        for combination in product(*[list(values[name]) for name in names])
+    ]
+
+
+def random_design(ranges: dict[str, tuple], point_count: int, seed=None) -> list[dict]:
+    """point_count points drawn uniformly within the given (low, high) range of each parameter.
+    Parameters that Config declares as int get int values, with the bounds rounded
+    """
+    rng = np.random.default_rng(as_seed_sequence(seed))
+
+    design = [{} for _ in range(point_count)]
+
+    for name, (low, high) in ranges.items():
+        if config_field_types.get(name) is int:
+            values = rng.integers(
+                round(low), round(high), point_count, endpoint=True
+            ).tolist()
+        else:
+            values = rng.uniform(low, high, point_count).tolist()
+
+        for point, value in zip(design, values):
+            point[name] = value
+
+    return design
+
+
+def run_sweep(
+    design: list[dict],
+    base_config: Config = None,
+    replicates: int = 1,
+    workers: int = None,
+    seed=None,
+) -> Iterator[dict]:
+    """Runs every point of the design in a process pool and yields tidy result rows as each run finishes.
+    Every point reuses the same replicate seeds, so differences between points come from the parameters
+    """
+    base_config = base_config or default_config
+
+    # Validate every point before starting anything
+    configs = [base_config.replace(**point) for point in design]
+
+    replicate_seeds = spawn_seeds(seed, replicates)
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = {
+            executor.submit(run_replicate, config, replicate_seed): (
+                point_index,
+                replicate,
+            )
+            for point_index, config in enumerate(configs)
+            for replicate, replicate_seed in enumerate(replicate_seeds)
+        }
+
+        for future in as_completed(futures):
+            point_index, replicate = futures[future]
+
+            yield from summary_rows(
+                future.result(), design[point_index], point_index, replicate
+            )
+
+
+def summary_rows(
+    summary: dict, point: dict, point_index: int, replicate: int
+) -> list[dict]:
+    """One row per language published in by the end of a run, with its parameters and outcome"""
+    final_counts = summary["yearly_language_counts"][-1]
+    total = int(final_counts.sum())
+
+    return [
+        {
+            "point": point_index,
+            "replicate": replicate,
+            **point,
+            "article_count": summary["article_count"],
+            "author_count": summary["author_count"],
+            "language": language,
+            "articles": int(count),
+            "share": int(count) / total,
+        }
+        for language, count in zip(summary["languages"], final_counts)
+        if count > 0
+    ]
+
+
+def _parse_values(argument: str) -> tuple[str, list]:
+    """Parses a name=value,value,... command line argument"""
+    name, values = argument.split("=", 1)
+
+    return name, [literal_eval(value) for value in values.split(",")]
+
+
+if __name__ == "__main__":
+    parser = ArgumentParser(description="Runs the model over a design of parameters")
+    parser.add_argument(
+        "-g",
+        "--grid",
+        action="append",
+        default=[],
+        help="name=value,value,... to try every value of a parameter",
+    )
+    parser.add_argument(
+        "-r",
+        "--random",
+        action="append",
+        default=[],
+        help="name=low,high to draw a parameter uniformly",
+    )
+    parser.add_argument("-p", "--points", type=int, default=10)
+    parser.add_argument("-n", "--replicates", type=int, default=1)
+    parser.add_argument("-w", "--workers", type=int, default=None)
+    parser.add_argument("-s", "--seed", type=int, default=default_config.model_seed)
+    parser.add_argument("-o", "--output", default="sweep.csv")
+    arguments = parser.parse_args()
+
+    if arguments.random:
+        design = random_design(
+            dict(_parse_values(argument) for argument in arguments.random),
+            arguments.points,
+            arguments.seed,
+        )
+    else:
+        design = grid_design(
+            dict(_parse_values(argument) for argument in arguments.grid)
+        )
+
+    rows = []
+
+    for row in run_sweep(
+        design,
+        replicates=arguments.replicates,
+        workers=arguments.workers,
+        seed=arguments.seed,
+    ):
+        rows.append(row)
+
+    # Order the table by design point, regardless of which run finished first
+    rows.sort(key=lambda row: (row["point"], row["replicate"], -row["articles"]))
+
+    write_table(rows, arguments.output)
+
+    print(
+        f"Ran {len(design) * arguments.replicates} simulations into {arguments.output}"
+    )
@@ -0,0 +1,100 @@
+from src.article_store import ArticleStore
+from src.ranking import AttractivenessRanking
+from utils.language_masks import words_boolean_mask
+import numpy as np
+
+
+class TopLanguages:
+    """Languages of the ranked articles, most attractive first, along with the first positions each language holds.
+    It's rebuilt once per step, right after the ranking, and shared by every author picking a language to learn.
+    Authors learn before any article gets published in the step, so the ranked articles are all there is
+    """
+
+    def __init__(
+        self,
+        article_store: ArticleStore,
+        ranking: AttractivenessRanking,
+        pool_size: int,
+    ) -> None:
+        self.article_store = article_store
+        self.ranking = ranking
+
+        # How many top articles in unknown languages an author picks from
+        self.pool_size = pool_size
+
+        language_count = len(article_store.languages)
+
+        # Language code of each ranked article
+        self._languages = np.zeros(0, dtype=np.int16)
+
+        # How many ranked articles are in each language
+        self._counts = np.zeros(language_count, dtype=np.int64)
+
+        # For each language code, the first pool_size positions holding it, padded with the ranking's length
+        self._first_positions = np.zeros((language_count, pool_size), dtype=np.int64)
+
+    def rebuild(self) -> None:
+        """Reads the ranking, which must have just been refreshed"""
+        languages = self.article_store.language[self.ranking.rows]
+        language_count = len(self._counts)
+
+        self._languages = languages
+        self._counts = np.bincount(languages, minlength=language_count)
+
+        # Positions grouped by language, each group in ranked order
+        order = np.argsort(languages, kind="stable")
+        starts = np.cumsum(self._counts) - self._counts
+
+        # Keep the start of each group
+        slots = np.arange(self.pool_size)
+        filled = slots < self._counts[:, None]
+
+        self._first_positions = np.full(
+            (language_count, self.pool_size), len(languages), dtype=np.int64
+        )
+        self._first_positions[filled] = order[(starts[:, None] + slots)[filled]]
+
+    def sample_many(
+        self, language_words: np.ndarray, rng: np.random.Generator
+    ) -> np.ndarray:
+        """Draws a language for each of a batch of authors, given as rows of bitmask words (see AuthorStore): evenly from
+        the languages of the pool_size most attractive articles in languages the author doesn't know, or -1 if there are none
+        """
+        unknown = ~words_boolean_mask(language_words, len(self._counts))
+        ranked_counts = unknown @ self._counts
+
+        languages = np.full(len(language_words), -1, dtype=np.int64)
+
+        # When there are enough ranked articles, the pool_size first positions of every unknown language
+        # hold the pool_size first unknown ones overall
+        full = np.flatnonzero(ranked_counts >= self.pool_size)
+
+        if len(full):
+            indexes = rng.integers(self.pool_size, size=len(full))
+
+            candidates = np.where(
+                unknown[full, :, None], self._first_positions, len(self._languages)
+            ).reshape(len(full), -1)
+            candidates.sort(axis=1)
+
+            languages[full] = self._languages[candidates[np.arange(len(full)), indexes]]
+
+        # Otherwise the pool takes every ranked one
+        for index in np.flatnonzero(ranked_counts < self.pool_size).tolist():
+            languages[index] = self._sample_short_pool(
+                unknown[index], int(ranked_counts[index]), rng
+            )
+
+        return languages
+
+    def _sample_short_pool(
+        self, unknown: np.ndarray, ranked_count: int, rng: np.random.Generator
+    ) -> int:
+        """Draws from a pool with fewer than pool_size articles"""
+        if not ranked_count:
+            return -1
+
+        candidates = self._first_positions[unknown].ravel()
+        pool = self._languages[np.sort(candidates)[:ranked_count]]
+
+        return int(pool[rng.integers(ranked_count)])
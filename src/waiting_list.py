@@ -0,0 +1,74 @@
+from typing import Iterable
+from src.author import Author
+from utils.language_masks import mask_language_codes
+import numpy as np
+
+
+class WaitingList:
+    """Authors waiting for a new article, indexed by the languages they speak"""
+
+    def __init__(self, authors: Iterable[Author]) -> None:
+        # Waiting authors, in no particular order
+        self._authors: list[Author] = []
+
+        # Position of each author in the list above
+        self._positions: dict[Author, int] = {}
+
+        # For each language code, the authors that speak it mapped to the order in which they applied
+        self._by_language: dict[int, dict[Author, int]] = {}
+
+        # Codes of the languages each author is indexed under
+        self._indexed_languages: dict[Author, list[int]] = {}
+
+        for application_order, author in enumerate(authors):
+            self._add(author, application_order)
+
+    def __len__(self) -> int:
+        return len(self._authors)
+
+    def _add(self, author: Author, application_order: int) -> None:
+        self._positions[author] = len(self._authors)
+        self._authors.append(author)
+
+        self._indexed_languages[author] = mask_language_codes(author.languages)
+
+        for language in self._indexed_languages[author]:
+            self._by_language.setdefault(language, {})[author] = application_order
+
+    def draw(self, rng: np.random.Generator) -> Author:
+        """Picks a random waiting author"""
+        return self._authors[rng.integers(len(self._authors))]
+
+    def remove(self, author: Author) -> None:
+        """Takes an author out of the list"""
+        # Fill its spot with the last author
+        position = self._positions.pop(author)
+        last_author = self._authors.pop()
+
+        if last_author is not author:
+            self._authors[position] = last_author
+            self._positions[last_author] = position
+
+        # Remove it from the language index
+        for language in self._indexed_languages.pop(author):
+            del self._by_language[language][author]
+
+    def first_speaking(self, languages: int) -> Author:
+        """Returns the earliest applicant that speaks any of the languages in a bitmask, or None"""
+        first_author = None
+        first_order = None
+
+        for language in mask_language_codes(languages):
+            speakers = self._by_language.get(language)
+
+            if not speakers:
+                continue
+
+            # Speakers are kept in application order
+            author, application_order = next(iter(speakers.items()))
+
+            if first_order is None or application_order < first_order:
+                first_author = author
+                first_order = application_order
+
+        return first_author
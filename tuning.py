@@ -5,6 +5,9 @@ import math
 # Range of years model should simulate
 model_years_range = (1915, 2020)
 
+# Seed for the model's random streams. None draws a fresh one every run
+model_seed = None
+
 # === Article publication
 
 # Range of months needed for making an article
@@ -28,11 +31,13 @@ article_quality_randomness = 0.4
 reference_count_range = (10, 50)
 reference_count_skew = 2
 
+
 # Modifier of the extra article chance, based on the current amount of published articles
 # This is important to make the simulation smoother on the first years
-reference_chance_modifier = lambda articles_count: articles_count / (
-    articles_count + 1000.0
-)
+# A named function rather than a lambda, so configurations can be sent to other processes
+def reference_chance_modifier(articles_count: int) -> float:
+    return articles_count / (articles_count + 1000.0)
+
 
 # Degree to which reference count affects attractability of article on references
 reference_count_attractability = 0.3
@@ -117,5 +122,9 @@ article_language_evaluation_pool_size = 100
 # Number of articles to look up when updating the model's language weights
 language_evaluation_pool_size = 1000
 
+# Whether to update the model's language weights from only the top language_evaluation_pool_size articles,
+# instead of from every published article
+language_evaluation_windowed = False
+
 # How much of an impact do each month's language weights have when updating the model's language weights
 language_update_speed = 0.15
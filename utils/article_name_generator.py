@@ -1,68 +1,307 @@
+from bisect import bisect_left, bisect_right
+from functools import lru_cache
+from typing import Callable, Iterator
 import data.article_names as article
-import random
+import numpy as np
+
+from src.config import Config, default_config
+
+# Kinds of words a title slot can take. The "a_" kinds are words along with their "a" or "an"
+NOUN, PLURAL_NOUN, ADJECTIVE, A_NOUN, A_ADJECTIVE = range(5)
+
+# Kind with its "a" or "an", for the kinds that can follow one
+with_indefinite_article = {NOUN: A_NOUN, ADJECTIVE: A_ADJECTIVE}
+
+# Stands for a noun phrase in layouts
+PLACEHOLDER = "{}"
+
+# Titles drawn freely before settling for one drawn to fit, so each title has a bounded cost.
+# About half the free ones are of an invalid size, so this almost never happens
+max_title_draws = 16
+
+# Irregular plurals
+edge_case_plurals = {
+    "cactus": "cacti",
+    "campus": "campi",
+    "child": "children",
+    "goose": "geese",
+    "man": "men",
+    "woman": "women",
+    "tooth": "teeth",
+    "foot": "feet",
+    "mouse": "mice",
+    "person": "people",
+    "matrix": "matrices",
+    "index": "indices",
+    "criterion": "criteria",
+    "phenomenon": "phenomena",
+    # Invariables
+    "ash": "ash",
+    "fish": "fish",
+    "sheep": "sheep",
+    "series": "series",
+    "species": "species",
+    "deer": "deer",
+}
+
+
+def _uniforms(rng: np.random.Generator, block_size: int) -> Iterator[float]:
+    """Endless uniform draws, taken from a generator in blocks"""
+    while True:
+        yield from rng.random(block_size).tolist()
+
+
+class TitleGenerator:
+    """Generates article titles from the grammar in data/article_names.py, compiled once:
+    words come with their plurals and indefinite articles already worked out, and layouts already split.
+    Titles of an invalid size are thrown away and drawn again, up to max_title_draws times,
+    after which a plain noun phrase gets drawn with word lengths that make it fit
+    """
+
+    def __init__(self, config: Config = None) -> None:
+        self.config = config or default_config
+
+        # Words, by kind
+        self.words = {
+            NOUN: list(article.noun),
+            PLURAL_NOUN: [_plurify(noun) for noun in article.noun],
+            ADJECTIVE: list(article.adjective),
+            A_NOUN: [_with_indefinite_article(noun) for noun in article.noun],
+            A_ADJECTIVE: [
+                _with_indefinite_article(adjective) for adjective in article.adjective
+            ],
+        }
+
+        # Layouts as lists of literal text and placeholders
+        self.layouts = [_split_layout(layout) for layout in article.layout]
+
+        self.connectors = tuple(article.connector)
+
+        # Words of the kinds fitted titles use, sorted by length, along with their lengths
+        self.sorted_words = {
+            kind: sorted(self.words[kind], key=len) for kind in (NOUN, ADJECTIVE)
+        }
+        self.word_lengths = {
+            kind: [len(word) for word in words]
+            for kind, words in self.sorted_words.items()
+        }
+
+    def generate(self, rng: np.random.Generator) -> str:
+        """Generates a single title"""
+        return self._generate(_uniforms(rng, 32).__next__)
+
+    def generate_many(self, count: int, rng: np.random.Generator) -> list[str]:
+        """Generates count titles"""
+        uniform = _uniforms(rng, 32 * count + 16).__next__
+
+        return [self._generate(uniform) for _ in range(count)]
+
+    def _generate(self, uniform: Callable[[], float]) -> str:
+        config = self.config
+
+        for _ in range(max_title_draws):
+            title = "".join(self._draw_parts(uniform))
+
+            # Make sure it's size is valid
+            if config.min_name_size < len(title) < config.max_name_size:
+                break
+
+        else:
+            title = self._draw_fitting_noun_phrase(uniform)
+
+        # Capitalize
+        if uniform() <= config.all_capitalized_chance:
+            return " ".join([_capitalize(word) for word in title.split(" ")])
+
+        return _capitalize(title)
+
+    def _draw_parts(self, uniform: Callable[[], float]) -> list[str]:
+        """Pieces of text that make up a title, from a layout with its placeholders expanded"""
+        config = self.config
+
+        # Random chance of picking a layout
+        layout_index = round(uniform() * 100)
+
+        if layout_index < len(self.layouts):
+            layout = self.layouts[layout_index]
+
+        # Generate without a layout
+        else:
+            layout = [PLACEHOLDER]
+
+        # Connectors, the unused ones after the used ones
+        connectors = None
+        used_connectors = 0
+
+        parts = []
+
+        # What comes next, last first, as a stack instead of recursion
+        pending = layout[::-1]
 
-# config
-import tuning
+        while pending:
+            item = pending.pop()
 
+            if item != PLACEHOLDER:
+                parts.append(item)
+                continue
 
-def generate_article_name() -> str:
-    # List of unused connectors
-    unused_connectors = article.connector.copy()
+            # Chance to return connector
+            if (
+                used_connectors < len(self.connectors)
+                and uniform() <= config.connector_chance
+            ):
+                # Only copied when one gets used
+                if connectors is None:
+                    connectors = list(self.connectors)
 
-    # Random chance of picking a layout
-    layout_index = round(random.random() * 100)
+                # Swap a random unused connector to the end of the used ones
+                index = used_connectors + int(
+                    uniform() * (len(connectors) - used_connectors)
+                )
+                connectors[used_connectors], connectors[index] = (
+                    connectors[index],
+                    connectors[used_connectors],
+                )
+                used_connectors += 1
 
-    if layout_index < len(article.layout):
-        layout = article.layout[layout_index]
+                # Expand both sides, left first
+                pending.extend(
+                    (PLACEHOLDER, f" {connectors[used_connectors - 1]} ", PLACEHOLDER)
+                )
+                continue
 
-        # Expand nouns for each if it's placeholdsers
-        article_name = _fill_placeholders(layout, unused_connectors)
+            self._draw_noun_phrase(parts, uniform)
 
-    # Generate without a layout
-    else:
-        article_name = _expand_article_noun(unused_connectors)
+        return parts
 
-    # Parse raw noun articles
-    article_name = _parse_noun_articles(article_name)
+    def _draw_noun_phrase(self, parts: list[str], uniform: Callable[[], float]) -> None:
+        """Appends an optional article, modifiers and a noun"""
+        config = self.config
 
-    # Capitalize
-    if random.random() <= tuning.all_capitalized_chance:
-        article_name = " ".join([_capitalize(word) for word in article_name.split(" ")])
-    else:
-        article_name = _capitalize(article_name)
+        plural = uniform() <= config.plural_chance
 
-    # Make sure it's size is valid
-    if not tuning.min_name_size < len(article_name) < tuning.max_name_size:
-        # Try again
-        return generate_article_name()
+        # "a" or "an" goes along with the next word
+        indefinite = False
 
-    return article_name
+        article_allowed = True
+        adjective_allowed = True
 
+        while True:
+            # Chance of article
+            if article_allowed and uniform() <= config.noun_article_chance:
+                # If plural, always use 'the'
+                if plural or uniform() <= 0.5:
+                    parts.append("the ")
+                else:
+                    indefinite = True
+
+            # Chance of adjective
+            elif adjective_allowed and uniform() <= config.adjective_chance:
+                parts.append(self._pick_word(ADJECTIVE, indefinite, uniform) + " ")
+                indefinite = False
+
+            # Chance of noun as adjective
+            elif uniform() <= config.noun_as_adjective_chance:
+                parts.append(self._pick_word(NOUN, indefinite, uniform) + " ")
+                indefinite = False
+                adjective_allowed = False
+
+            # Just the noun
+            else:
+                parts.append(
+                    self._pick_word(
+                        PLURAL_NOUN if plural else NOUN, indefinite, uniform
+                    )
+                )
+                return
 
-def _capitalize(text: str) -> str:
-    # Built in capitalize lowers other letters for some reason
-    return text[0].upper() + text[1:] if len(text) > 1 else text.upper()
+            # Articles can only come first
+            article_allowed = False
 
+    def _draw_fitting_noun_phrase(self, uniform: Callable[[], float]) -> str:
+        """Adjectives and a noun, as many adjectives as it takes to reach the valid sizes, with each word
+        drawn among the lengths that let the following ones fit
+        """
+        word_lengths = self.word_lengths
 
-def _parse_noun_articles(text: str) -> str:
-    words = text.split(" ")
+        kinds = [NOUN]
 
-    try:
-        while True:
-            # Get next occurrence of <a>
-            occurrence = words.index("<a>")
+        # Add adjectives in front until the longest words, and the spaces between them, reach the minimum size
+        while (
+            sum(word_lengths[kind][-1] for kind in kinds) + len(kinds) - 1
+            <= self.config.min_name_size
+        ):
+            kinds.insert(0, ADJECTIVE)
 
-            # Check if word right next to it starts with vowel
-            if _is_vowel(words[occurrence + 1][0]):
-                words[occurrence] = "an"
-            else:
-                words[occurrence] = "a"
+        # Range of total word lengths that fit, both included, leaving out the spaces
+        low = self.config.min_name_size + 1 - (len(kinds) - 1)
+        high = self.config.max_name_size - 1 - (len(kinds) - 1)
+
+        # Shortest and longest total of the words still to draw after the current one
+        rest_shortest = sum(word_lengths[kind][0] for kind in kinds)
+        rest_longest = sum(word_lengths[kind][-1] for kind in kinds)
+
+        words = []
+        used_length = 0
+
+        for kind in kinds:
+            lengths = word_lengths[kind]
+            rest_shortest -= lengths[0]
+            rest_longest -= lengths[-1]
+
+            # Words whose length lets the rest still fit
+            start = min(
+                bisect_left(lengths, low - used_length - rest_longest), len(lengths) - 1
+            )
+            end = max(
+                bisect_right(lengths, high - used_length - rest_shortest), start + 1
+            )
+
+            word = self.sorted_words[kind][start + int(uniform() * (end - start))]
+            words.append(word)
+            used_length += len(word)
+
+        return " ".join(words)
+
+    def _pick_word(
+        self, kind: int, indefinite: bool, uniform: Callable[[], float]
+    ) -> str:
+        words = self.words[with_indefinite_article[kind] if indefinite else kind]
+        return words[int(uniform() * len(words))]
+
+
+@lru_cache(maxsize=16)
+def title_generator(config: Config = None) -> TitleGenerator:
+    """Compiled title generator for a config, shared by everything that uses it"""
+    return TitleGenerator(config)
+
+
+def generate_article_name(rng: np.random.Generator, config: Config = None) -> str:
+    """Generates a single title, see TitleGenerator"""
+    return title_generator(config or default_config).generate(rng)
+
+
+def _split_layout(layout: str) -> list[str]:
+    """Layout as literal text and placeholders, without empty text"""
+    parts = []
+
+    for index, text in enumerate(layout.split(PLACEHOLDER)):
+        if index:
+            parts.append(PLACEHOLDER)
+
+        if text:
+            parts.append(text)
+
+    return parts
 
-    except ValueError:
-        # No more raw articles!
-        pass
 
-    return " ".join(words)
+def _capitalize(text: str) -> str:
+    # Built in capitalize lowers other letters for some reason
+    return text[0].upper() + text[1:] if len(text) > 1 else text.upper()
+
+
+def _with_indefinite_article(word: str) -> str:
+    return f"an {word}" if _is_vowel(word[0]) else f"a {word}"
 
 
 def _is_vowel(letter: str) -> bool:
@@ -71,31 +310,6 @@ def _is_vowel(letter: str) -> bool:
 
 def _plurify(word: str) -> str:
     """Returns the word in plural form"""
-    # Edge cases
-    edge_case = {
-        "cactus": "cacti",
-        "campus": "campi",
-        "child": "children",
-        "goose": "geese",
-        "man": "men",
-        "woman": "women",
-        "tooth": "teeth",
-        "foot": "feet",
-        "mouse": "mice",
-        "person": "people",
-        "matrix": "matrices",
-        "index": "indices",
-        "criterion": "criteria",
-        "phenomenon": "phenomena",
-        # Invariables
-        "ash": "ash",
-        "fish": "fish",
-        "sheep": "sheep",
-        "series": "series",
-        "species": "species",
-        "deer": "deer",
-    }
-
     # If a singular noun ends in ‑y and the letter before the -y is a consonant
     if word.endswith("y") and not _is_vowel(word[-2]):
         return word[:-1] + "ies"
@@ -125,67 +339,8 @@ def _plurify(word: str) -> str:
         return word + "es"
 
     # Edge cases
-    if word in edge_case:
-        return edge_case[word]
+    if word in edge_case_plurals:
+        return edge_case_plurals[word]
 
     # Regular case
     return word + "s"
-
-
-def _pick_word(word_type: str, plural: bool = False) -> str:
-    word = random.choice(getattr(article, word_type))
-
-    # If plural, modify word
-    if plural:
-        return _plurify(word)
-    return word
-
-
-def _fill_placeholders(text: str, unused_connectors: list[str]) -> str:
-    # Expand nouns for each placeholder
-    return text.format(
-        *[_expand_article_noun(unused_connectors) for _ in range(text.count("{}"))]
-    )
-
-
-def _expand_article_noun(unused_connectors: list[str]) -> str:
-    # Chance to return connector
-    if len(unused_connectors) > 0 and random.random() <= tuning.connector_chance:
-        connector = random.choice(unused_connectors)
-        # Remove connector
-        unused_connectors.remove(connector)
-
-        return _fill_placeholders("{} " + connector + " {}", unused_connectors)
-
-    # Return noun
-    return _generate_article_noun(
-        plural=random.random() <= tuning.plural_chance,
-        adjective_allowed=True,
-        article_allowed=True,
-    )
-
-
-def _generate_article_noun(
-    plural: bool, adjective_allowed: bool, article_allowed: bool = False
-) -> str:
-    # Chance of article
-    if article_allowed and random.random() <= tuning.noun_article_chance:
-        return f"{_place_article(plural)} {_generate_article_noun(plural, adjective_allowed=adjective_allowed)}"
-
-    # Chance of adjective
-    if adjective_allowed and random.random() <= tuning.adjective_chance:
-        return f"{_pick_word('adjective')} {_generate_article_noun(plural, adjective_allowed=True)}"
-
-    # Chance of noun as adjective
-    if random.random() <= tuning.noun_as_adjective_chance:
-        return f"{_pick_word('noun')} {_generate_article_noun(plural, adjective_allowed=False)}"
-
-    # Just return the noun
-    return _pick_word("noun", plural)
-
-
-def _place_article(plural: bool) -> str:
-    # If plural, always use 'the'
-    if plural or random.random() <= 0.5:
-        return "the"
-    return "<a>"
@@ -1,27 +1,37 @@
-from typing import Callable
 from data.list_of_names import list_of_names
 import numpy as np
-import random
 
 # config
 import tuning
 
-# ID number generator
-def id_getter() -> Callable[[], int]:
-    # IDs taken
-    ids_taken = 0
 
-    def get() -> int:
-        nonlocal ids_taken
-        ids_taken += 1
+class IdGetter:
+    """Hands out consecutive ids when called"""
+
+    def __init__(self, ids_taken: int = 0) -> None:
+        # IDs taken
+        self.ids_taken = ids_taken
 
-        return ids_taken - 1
+    def __call__(self) -> int:
+        self.ids_taken += 1
 
-    return get
+        return self.ids_taken - 1
+
+
+# ID number generator
+def id_getter(ids_taken: int = 0) -> IdGetter:
+    return IdGetter(ids_taken)
 
 
 # Author name generator
-def generate_author_name() -> str:
-    names = random.sample(list_of_names, 2)
-    return " ".join(names)
+def generate_author_name(rng: np.random.Generator) -> str:
+    first_draw, second_draw = rng.random(2).tolist()
+
+    # Two different names, the second one drawn among the others
+    first = int(first_draw * len(list_of_names))
+    second = int(second_draw * (len(list_of_names) - 1))
+
+    if second >= first:
+        second += 1
 
+    return f"{list_of_names[first]} {list_of_names[second]}"
@@ -0,0 +1,53 @@
+import numpy as np
+
+# Sets of languages are kept as int bitmasks, with bit n set when the language with code n is in the set
+
+
+def mask_language_codes(mask: int) -> list[int]:
+    """Language codes in a bitmask, lowest first"""
+    language_codes = []
+
+    while mask:
+        # Isolate the lowest set bit
+        lowest_bit = mask & -mask
+        language_codes.append(lowest_bit.bit_length() - 1)
+
+        mask ^= lowest_bit
+
+    return language_codes
+
+
+def word_count(language_count: int) -> int:
+    """How many 64 bit words a bitmask over language_count languages takes"""
+    return (language_count + 63) // 64
+
+
+def mask_words(mask: int, count: int) -> np.ndarray:
+    """Bitmask as count little-endian 64 bit words, lowest first"""
+    return np.frombuffer(mask.to_bytes(8 * count, "little"), dtype="<u8")
+
+
+def words_mask(words: np.ndarray) -> int:
+    """Bitmask held in little-endian 64 bit words, lowest first"""
+    return int.from_bytes(words.tobytes(), "little")
+
+
+def boolean_mask_words(known: np.ndarray) -> np.ndarray:
+    """Each row of a boolean (authors, languages) array as a row of little-endian 64 bit words"""
+    mask_bytes = np.packbits(known, axis=1, bitorder="little")
+
+    # Pad every row to whole words
+    padded = np.zeros((len(known), 8 * word_count(known.shape[1])), dtype=np.uint8)
+    padded[:, : mask_bytes.shape[1]] = mask_bytes
+
+    return padded.view("<u8")
+
+
+def words_boolean_mask(words: np.ndarray, language_count: int) -> np.ndarray:
+    """Each row of little-endian 64 bit words as a row of a boolean (authors, languages) array"""
+    return np.unpackbits(
+        np.ascontiguousarray(words).view(np.uint8),
+        axis=1,
+        count=language_count,
+        bitorder="little",
+    ).view(bool)
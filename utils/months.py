@@ -4,3 +4,14 @@ Month = Enum(
     "Month",
     "JANUARY FEBRUARY MARCH APRIL MAY JUNE JULY AUGUST SEPTEMBER OCTOBER NOVEMBER DECEMBER",
 )
+
+
+def month_index(year: int, month: Month) -> int:
+    """Returns a single monotonically increasing index for the given month"""
+    return year * 12 + month.value - 1
+
+
+def from_month_index(index: int) -> tuple[Month, int]:
+    """Returns the (month, year) pair of a month index"""
+    index = int(index)
+    return Month(index % 12 + 1), index // 12
@@ -1,37 +1,178 @@
-from random import randrange, random, sample
-from typing import Iterable
+from bisect import bisect_right
+from functools import lru_cache
 import numpy as np
 
 
-def skewed_range(init, end, skew, round_result=False):
+def spawn_seeds(seed, count: int) -> list[np.random.SeedSequence]:
+    """Splits a seed into count independent seeds, e.g. for replicates"""
+    return as_seed_sequence(seed).spawn(count)
+
+
+def as_seed_sequence(seed) -> np.random.SeedSequence:
+    """Accepts an int, None or an existing seed sequence"""
+    if isinstance(seed, np.random.SeedSequence):
+        return seed
+
+    return np.random.SeedSequence(seed)
+
+
+class KeyedGenerator:
+    """Generators for fixed positions under a seed, e.g. one per agent id, independent of everything drawn before.
+    Philox is counter based, so a position's generator only takes resetting the counter to its keys, not seeding one
+    """
+
+    def __init__(self, seed: np.random.SeedSequence) -> None:
+        self._bit_generator = np.random.Philox(key=seed.generate_state(2, np.uint64))
+        self._generator = np.random.Generator(self._bit_generator)
+
+        # State reused on every reset, with the counter filled in
+        self._state = self._bit_generator.state
+
+    def get(self, *keys: int) -> np.random.Generator:
+        """Generator for the position, at most two keys. It's shared, so it only holds until the next call"""
+        state = self._state
+        # Keys go in the high words of the counter, leaving the low ones to count draws
+        state["state"]["counter"][:] = (0,) * (4 - len(keys)) + keys
+
+        # Drop anything buffered from the previous position
+        state["buffer_pos"] = len(state["buffer"])
+        state["has_uint32"] = 0
+
+        self._bit_generator.state = state
+
+        return self._generator
+
+
+def skewed_range(init, end, skew, round_result, rng: np.random.Generator):
     """Returns a number in the range, skewed to the center by skew amount"""
-    result = sum([randrange(init, end) for _ in range(skew)]) / skew
-    return round(result) if round_result else result
+    values, cumulative_probabilities = _skewed_range_distribution(
+        init, end, skew, round_result
+    )
+
+    return values[bisect_right(cumulative_probabilities, rng.random())]
+
+
+def skewed_range_many(
+    init, end, skew, round_result, size, rng: np.random.Generator
+) -> np.ndarray:
+    """Returns size numbers in the range, skewed to the center by skew amount"""
+    values, cumulative_probabilities = _skewed_range_distribution(
+        init, end, skew, round_result
+    )
+
+    return np.asarray(values)[
+        np.searchsorted(cumulative_probabilities, rng.random(size), side="right")
+    ]
+
+
+@lru_cache(maxsize=None)
+def _skewed_range_distribution(init, end, skew, round_result):
+    """Exact distribution of the average of skew draws from range(init, end), as (values, cumulative probabilities)"""
+    # Distribution of the sum of skew draws, shifted to start at 0
+    sum_probabilities = np.ones(1)
+    draw_probabilities = np.full(end - init, 1.0 / (end - init))
+
+    for _ in range(skew):
+        sum_probabilities = np.convolve(sum_probabilities, draw_probabilities)
+
+    # Value each sum maps to
+    values = [(init * skew + total) / skew for total in range(len(sum_probabilities))]
+
+    # Rounding merges neighboring sums into the same value
+    if round_result:
+        values = [round(value) for value in values]
+
+    distinct_values = sorted(set(values))
+    value_probabilities = dict.fromkeys(distinct_values, 0.0)
+
+    for value, probability in zip(values, sum_probabilities):
+        value_probabilities[value] += probability
+
+    cumulative_probabilities = np.cumsum(list(value_probabilities.values()))
 
+    # Make sure every draw lands on a value despite floating point error
+    cumulative_probabilities[-1] = 1.0
 
-def skewed_random(skew):
-    """Returns a number in [0, 1), skewed to the center by skew amount"""
-    return sum([random() for _ in range(skew)]) / skew
+    return distinct_values, cumulative_probabilities.tolist()
+
+
+def skewed_random_many(skew, size, rng: np.random.Generator) -> np.ndarray:
+    """Returns size numbers in [0, 1), skewed to the center by skew amount"""
+    return rng.random((size, skew)).mean(axis=1)
 
 
 def weighted_sample(
-    iterable: Iterable, weights: list[float], sample_size: int, replace=False
-):
-    # If weights are 0, return randomly
-    if sum(weights) == 0:
-        return sample(iterable, sample_size)
-
-    # In case items do not sum to 1, we need to tweak them:
-
-    # How much we need to multiply each weight by
-    weights_correction = 1.0 / sum(weights)
-
-    # Apply the correction
-    weights_corrected = np.array(weights) * weights_correction
-
-    return np.random.choice(
-        iterable,
-        sample_size,
-        replace,
-        weights_corrected,
-    ).tolist()
+    weights: np.ndarray,
+    sample_size: int,
+    rng: np.random.Generator,
+    replace=False,
+    buffer: np.ndarray = None,
+) -> np.ndarray:
+    """Returns sample_size indices of weights, drawn in proportion to them. Draws are written to buffer if provided"""
+    weights = _valid_weights(weights)
+
+    if replace:
+        # Invert the cumulative distribution
+        draws = _draw_uniforms(rng, sample_size, buffer)
+        cumulative_weights = np.cumsum(weights)
+
+        return np.searchsorted(
+            cumulative_weights, draws * cumulative_weights[-1], side="right"
+        )
+
+    # Without replacement, the indices with the smallest exponential key / weight form the sample
+    keys = _draw_exponentials(rng, len(weights), buffer)
+
+    with np.errstate(divide="ignore"):
+        keys /= weights
+
+    if sample_size >= len(weights):
+        return np.argsort(keys)
+
+    # Only sort the ones that were picked
+    picked = np.argpartition(keys, sample_size - 1)[:sample_size]
+
+    return picked[np.argsort(keys[picked])]
+
+
+def weighted_sample_many(
+    weights: np.ndarray,
+    sample_sizes: list[int],
+    rng: np.random.Generator,
+) -> list[np.ndarray]:
+    """Draws one sample without replacement for each of the sample sizes, all from the same weights"""
+    weights = _valid_weights(weights)
+
+    # One row of keys per sample
+    with np.errstate(divide="ignore"):
+        keys = rng.standard_exponential((len(sample_sizes), len(weights))) / weights
+
+    order = np.argsort(keys, axis=1)
+
+    return [
+        order[index, :sample_size] for index, sample_size in enumerate(sample_sizes)
+    ]
+
+
+def _valid_weights(weights: np.ndarray) -> np.ndarray:
+    weights = np.asarray(weights, dtype=np.float64)
+
+    # If weights are 0, sample evenly
+    if not weights.any():
+        return np.ones(len(weights))
+
+    return weights
+
+
+def _draw_uniforms(rng: np.random.Generator, count: int, buffer: np.ndarray = None):
+    if buffer is None:
+        return rng.random(count)
+
+    return rng.random(out=buffer[:count])
+
+
+def _draw_exponentials(rng: np.random.Generator, count: int, buffer: np.ndarray = None):
+    if buffer is None:
+        return rng.standard_exponential(count)
+
+    return rng.standard_exponential(out=buffer[:count])